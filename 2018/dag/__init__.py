@@ -0,0 +1 @@
+from .graph import DAG
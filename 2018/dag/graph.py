@@ -0,0 +1,80 @@
+import heapq
+
+
+class DAG:
+    """A directed acyclic graph over orderable nodes.
+
+    Edges point from a node to the nodes that depend on it. Wherever the
+    graph leaves a choice of which node comes next, the smallest ready node
+    goes first.
+    """
+
+    def __init__(self, edges=()):
+        self.successors = {}
+        self.in_degree = {}
+        for before, after in edges:
+            self.add_edge(before, after)
+
+    def __len__(self):
+        return len(self.successors)
+
+    def add_node(self, node):
+        if node not in self.successors:
+            self.successors[node] = []
+            self.in_degree[node] = 0
+
+    def add_edge(self, before, after):
+        self.add_node(before)
+        self.add_node(after)
+        self.successors[before].append(after)
+        self.in_degree[after] += 1
+
+    def serial_order(self):
+        """Return the nodes in dependency order (Kahn's algorithm, smallest
+        ready node first)."""
+        waiting_on = dict(self.in_degree)
+        ready = [node for node, count in waiting_on.items() if not count]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            node = heapq.heappop(ready)
+            order.append(node)
+            self._release(node, waiting_on, ready)
+        self._check(order)
+        return order
+
+    def parallel_schedule(self, workers, cost_fn):
+        """Return the order nodes finish in, and when the last one does, with
+        `workers` working at once and node n taking cost_fn(n) to do."""
+        if workers < 1:
+            raise ValueError('need at least one worker, not %d' % workers)
+        waiting_on = dict(self.in_degree)
+        ready = [node for node, count in waiting_on.items() if not count]
+        heapq.heapify(ready)
+        # (finish time, node) for every node being worked on.
+        running = []
+        order = []
+        now = 0
+        while ready or running:
+            while ready and len(running) < workers:
+                node = heapq.heappop(ready)
+                heapq.heappush(running, (now + cost_fn(node), node))
+            # Jump straight to the next node finishing, and finish every node
+            # that does at the same time before handing out more work.
+            now = running[0][0]
+            while running and running[0][0] == now:
+                _, node = heapq.heappop(running)
+                order.append(node)
+                self._release(node, waiting_on, ready)
+        self._check(order)
+        return order, now
+
+    def _release(self, node, waiting_on, ready):
+        for successor in self.successors[node]:
+            waiting_on[successor] -= 1
+            if not waiting_on[successor]:
+                heapq.heappush(ready, successor)
+
+    def _check(self, order):
+        if len(order) != len(self.successors):
+            raise ValueError('graph has a cycle')
@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 
 
-def compute(changes):
+def simulate(changes):
     frequencies = set()
     frequency = 0
     while True:
@@ -12,11 +12,56 @@ def compute(changes):
             frequency += change
 
 
+def first_repeat(changes):
+    """Return the first frequency reached twice when the changes are applied
+    over and over."""
+    drift = sum(changes)
+    if drift == 0:
+        # The frequency is back where it started after every pass, so the
+        # first pass repeats within the second.
+        return simulate(changes)
+
+    prefixes = []
+    frequency = 0
+    seen = set()
+    for change in changes:
+        if frequency in seen:
+            return frequency
+        seen.add(frequency)
+        prefixes.append(frequency)
+        frequency += change
+
+    # In pass k the i-th frequency is prefixes[i] + k * drift, so only
+    # frequencies with the same remainder modulo the drift can ever meet,
+    # and each one is first caught up with by its nearest neighbour in
+    # that group on the side the drift moves towards.
+    groups = {}
+    for i, prefix in enumerate(prefixes):
+        groups.setdefault(prefix % drift, []).append((prefix, i))
+    direction = 1 if drift > 0 else -1
+    best = None
+    for group in groups.values():
+        group.sort(key=lambda entry: entry[0] * direction)
+        for (prefix, i), (target, _) in zip(group, group[1:]):
+            time = (target - prefix) // drift * len(changes) + i
+            if best is None or time < best[0]:
+                best = (time, target)
+    if best is None:
+        raise ValueError('no frequency is ever reached twice')
+    return best[1]
+
+
+def compute(changes):
+    """Return the frequency after one pass, and the first one reached twice."""
+    return sum(changes), first_repeat(changes)
+
+
 def main():
     with open('input.txt') as f:
-        frequency = compute(list(int(x) for x in f))
-        assert frequency == 83130
+        frequency, repeat = compute(list(int(x) for x in f))
+        assert repeat == 83130
         print(frequency)
+        print(repeat)
 
 
 if __name__ == '__main__':
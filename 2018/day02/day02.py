@@ -1,30 +1,40 @@
 #!/usr/bin/python3
 
+import collections
+
 
 def compute(ids):
+    """Return the checksum of the box IDs, and the letters shared by the two
+    IDs that differ in exactly one position."""
+    twos = 0
+    threes = 0
+    common = None
+    seen = set()
+    masked = set()
     for x in ids:
-        for y in ids:
-            if x == y:
-                continue
-            if len(x) != len(y):
-                continue
-            same = ''
-            differ = False
-            for i in range(len(x)):
-                if x[i] == y[i]:
-                    same += x[i]
-                    continue
-                if differ:
-                    break
-                differ = True
-            else:
-                return same
+        x = x.strip()
+        counts = set(collections.Counter(x).values())
+        twos += 2 in counts
+        threes += 3 in counts
+        if common is not None or x in seen:
+            continue
+        seen.add(x)
+        # Two IDs differ in exactly position i if they are the same with
+        # position i taken out.
+        for i in range(len(x)):
+            key = (i, x[:i] + x[i + 1:])
+            if key in masked:
+                common = key[1]
+                break
+            masked.add(key)
+    return twos * threes, common
 
 
 def main():
     with open('input.txt') as f:
-        checksum = compute(list(f))
-        print(checksum)
+        checksum, common = compute(f)
+    print(checksum)
+    print(common)
 
 
 if __name__ == '__main__':
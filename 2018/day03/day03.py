@@ -2,8 +2,14 @@
 
 import re
 
+# Maps a square's claim count to the count with one more claim, saturating
+# at 2 since all that matters is whether a square is claimed more than once.
+CLAIM_ONE_MORE = bytes([1, 2, 2]) + bytes(253)
+
 
 class Claim:
+    __slots__ = ('id', 'x', 'y', 'w', 'h')
+
     PARSE = re.compile(r'^#(\d+) @ (\d+),(\d+): (\d+)x(\d+)')
 
     def __init__(self, id, x, y, w, h):
@@ -25,38 +31,44 @@ class Claim:
         h = int(m.group(5))
         return Claim(id, x, y, w, h)
 
-    def __iter__(self):
-        for i in range(self.w):
-            for j in range(self.h):
-                yield (self.x + i, self.y + j)
-
 
 class Fabric:
+    """How many claims (0, 1, or 2 for more than one) cover each square
+    inch, as one bytearray per row."""
 
     def __init__(self, claims):
-        self._squares = {}
+        width = max((claim.x + claim.w for claim in claims), default=0)
+        height = max((claim.y + claim.h for claim in claims), default=0)
+        self._rows = [bytearray(width) for _ in range(height)]
         for claim in claims:
-            for (x, y) in claim:
-                self._squares.setdefault((x, y), []).append(claim)
+            end = claim.x + claim.w
+            for row in self._rows[claim.y:claim.y + claim.h]:
+                row[claim.x:end] = row[claim.x:end].translate(CLAIM_ONE_MORE)
 
     @property
-    def squares(self):
-        return self._squares.values()
+    def overlap(self):
+        """The number of square inches claimed more than once."""
+        return sum(row.count(2) for row in self._rows)
+
+    def overlaps(self, claim):
+        end = claim.x + claim.w
+        return any(row.find(2, claim.x, end) >= 0 for row in self._rows[claim.y:claim.y + claim.h])
 
 
 def compute(claims):
-    claims = set(claims)
+    """Return the area claimed more than once, and the claim that overlaps
+    no other."""
+    claims = list(claims)
     fabric = Fabric(claims)
-    overlapping = set()
-    for square in fabric.squares:
-        if len(square) > 1:
-            overlapping.update(square)
-    return (claims - overlapping).pop()
+    intact = next(claim for claim in claims if not fabric.overlaps(claim))
+    return fabric.overlap, intact
 
 
 def main():
     with open('input.txt') as f:
-        print(compute(Claim.of(x) for x in f).id)
+        overlap, intact = compute(Claim.of(x) for x in f)
+    print(overlap)
+    print(intact.id)
 
 
 if __name__ == '__main__':
@@ -1,47 +1,60 @@
 #!/usr/bin/python3
 
-import collections
-import re
+import array
+import datetime
 
-GUARD_RE = re.compile('Guard #(\d+) begins shift')
-TIME_RE = re.compile('\d\d\d\d-\d\d-\d\d \d\d:(\d\d)')
+
+def shift_day(timestamp):
+    """Return the ordinal of the night a '1518-11-01 23:58' timestamp
+    belongs to: shifts that begin before midnight count as the next day."""
+    day = datetime.date(int(timestamp[0:4]), int(timestamp[5:7]), int(timestamp[8:10])).toordinal()
+    return day + 1 if timestamp[11:13] == '23' else day
 
 
 def compute(input):
+    """Return the answers for both strategies from the records in `input`,
+    which can come in any order."""
+    # Sleep is recorded as difference arrays over the 60 minutes of the
+    # midnight hour: +1 where a nap starts and -1 where it ends, so the
+    # records of a night need not be paired up in order. A night's records
+    # can come before its guard's, so those wait in `pending` until the
+    # guard is known.
     guards = {}
-    i = 0
-    while i < len(input):
-        line = input[i]
-        i += 1
-
-        m = GUARD_RE.search(line)
-        guard = guards.setdefault(int(m.group(1)), collections.defaultdict(int))
-
-        asleep = None
-        while i < len(input) and 'begins shift' not in input[i]:
-            line = input[i]
-            i += 1
-
-            m = TIME_RE.search(line)
-            if 'falls asleep' in line:
-                asleep = int(m.group(1))
-            if 'wakes up' in line:
-                for minute in range(asleep, int(m.group(1))):
-                    guard[minute] += 1
-
-    max_guard = None
-    max_minute = None
-    max_asleep = 0
-    for guard, minutes in guards.items():
-        if not minutes:
+    night_guard = {}
+    pending = {}
+    for line in input:
+        line = line.strip()
+        if not line:
+            continue
+        day = shift_day(line[1:17])
+        text = line[19:]
+        if text.startswith('Guard'):
+            guard = int(text.split()[1][1:])
+            night_guard[day] = guard
+            diff = guards.setdefault(guard, array.array('i', [0]) * 61)
+            for minute, change in enumerate(pending.pop(day, ())):
+                diff[minute] += change
             continue
-        minute = max(minutes, key=lambda x: minutes[x])
-        if max_asleep < minutes[minute]:
-            max_guard = guard
-            max_minute = minute
-            max_asleep = minutes[minute]
+        if day in night_guard:
+            diff = guards[night_guard[day]]
+        else:
+            diff = pending.setdefault(day, array.array('i', [0]) * 61)
+        diff[int(line[15:17])] += 1 if text == 'falls asleep' else -1
+
+    strategy1 = (-1, None)
+    strategy2 = (-1, None)
+    for guard, diff in guards.items():
+        minutes = []
+        asleep = 0
+        for change in diff[:60]:
+            asleep += change
+            minutes.append(asleep)
+        most = max(minutes)
+        minute = minutes.index(most)
+        strategy1 = max(strategy1, (sum(minutes), guard * minute))
+        strategy2 = max(strategy2, (most, guard * minute))
+    return strategy1[1], strategy2[1]
 
-    return max_guard * max_minute
 
 def main():
     with open('input.txt') as f:
@@ -64,7 +77,9 @@ def main():
         #     "[1518-11-05 00:45] falls asleep",
         #     "[1518-11-05 00:55] wakes up",
         # ]))
-        print(compute(sorted(f.read().splitlines())))
+        strategy1, strategy2 = compute(f)
+    print(strategy1)
+    print(strategy2)
 
 
 if __name__ == '__main__':
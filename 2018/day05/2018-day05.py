@@ -1,35 +1,63 @@
 #!/usr/bin/python3
 
+import concurrent.futures
+import sys
 
-def compute_fixed(input):
-    accum = []
-    for x in input:
-        if not accum:
-            accum.append(x)
-            continue
-        if str.isupper(accum[-1]) == str.isupper(x):
-            accum.append(x)
+
+def react(polymer, removed=None):
+    """Return what is left of the ASCII bytes `polymer` once every pair of
+    adjacent opposite-polarity units has reacted, leaving out units of the
+    lowercase type `removed`."""
+    accum = bytearray()
+    for x in polymer:
+        if x | 32 == removed:
             continue
-        if accum[-1].lower() != x.lower():
+        # The same letter in the other case differs only in bit 5.
+        if accum and accum[-1] ^ x == 32:
+            accum.pop()
+        else:
             accum.append(x)
-            continue
-        accum.pop()
-    return len(accum)
+    return bytes(accum)
+
+
+# The reduced polymer each pool worker was started with, so tasks only need
+# to carry the unit type.
+_worker_polymer = None
+
+
+def _init_worker(polymer):
+    global _worker_polymer
+    _worker_polymer = polymer
+
+
+def _react_in_worker(removed):
+    return len(react(_worker_polymer, removed))
 
 
-def compute(input):
-    min_length = len(input)
-    for type in sorted(set(x.lower() for x in input)):
-        length = compute_fixed(x for x in input if x not in (type.lower(), type.upper()))
-        print('%s: %d' % (type, length))
-        min_length = min(length, min_length)
-    return min_length
+def compute(polymer, workers=None):
+    """Return the length of the shortest polymer left after taking out one
+    unit type, trying the types across `workers` processes (all CPUs by
+    default, in-process if 1)."""
+    # Removing a type cannot stop the pairs that already reacted without it
+    # from reacting, so start every type from the reduced polymer.
+    polymer = react(polymer)
+    types = sorted(set(polymer.lower()))
+    if workers == 1:
+        lengths = [len(react(polymer, x)) for x in types]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+                workers, initializer=_init_worker, initargs=(polymer,)) as executor:
+            lengths = list(executor.map(_react_in_worker, types))
+    for type, length in zip(types, lengths):
+        print('%s: %d' % (chr(type), length))
+    return min(lengths, default=len(polymer))
 
 
 def main():
-    with open('2018-day05-input.txt') as f:
-        units = compute(list(f.read().strip()))
-        print(units)
+    with open('2018-day05-input.txt', 'rb') as f:
+        polymer = f.read().strip()
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    print(compute(polymer, workers))
 
 
 if __name__ == '__main__':
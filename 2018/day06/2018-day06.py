@@ -1,56 +1,115 @@
 #!/usr/bin/python3
 
+import bisect
+import collections
+import sys
 
-def distance(a, b):
-    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+# The label of a cell with more than one nearest location.
+TIE = -1
 
 
-locations = []
-with open('2018-day06-input.txt') as f:
-    for line in f:
+def parse(text):
+    locations = []
+    for line in text.splitlines():
         tx, ty = line.strip().split(',')
         locations.append((int(tx), int(ty)))
+    return locations
 
-min_x = min(x for x, y in locations)
-max_x = max(x for x, y in locations)
-min_y = min(y for x, y in locations)
-max_y = max(y for x, y in locations)
-
-grid = {}
-for x in range(min_x, max_x + 1):
-    for y in range(min_y, max_y + 1):
-        pt = (x, y)
-        grid[pt] = sum(distance(x, pt) for x in locations) < 10_000
-print(sum(1 for x in grid.values() if x))
-
-# distance_grid = {}
-# location_grid = {}
-# excluded_locations = set()
-# for x in range(min_x, max_x + 1):
-#     for y in range(min_y, max_y + 1):
-#         pt = (x, y)
-#         for i, location in enumerate(locations):
-#             dist = distance(pt, location)
-#             if pt not in distance_grid:
-#                 distance_grid[pt] = dist
-#                 location_grid[pt] = i
-#                 continue
-#             if dist < distance_grid[pt]:
-#                 distance_grid[pt] = dist
-#                 location_grid[pt] = i
-#                 continue
-#             if dist == distance_grid[pt]:
-#                 location_grid[pt] = None
-#                 continue
-#         if x in (min_x, max_x) or y in (min_y, max_y):
-#             excluded_locations.add(location_grid[pt])
-#
-# counts = collections.defaultdict(int)
-# for location in location_grid.values():
-#     if location is None:
-#         continue
-#     if location in excluded_locations:
-#         continue
-#     counts[location] += 1
-#
-# print(max(counts.values()))
+
+def nearest(locations, min_x, min_y, max_x, max_y):
+    """Label each cell of the box with the index of its nearest location, or
+    TIE. Returns the labels row by row, and the width of a row.
+
+    This is a breadth-first search out from every location at once: a cell
+    is nearest to whatever the neighbours that reached it one step earlier
+    were nearest to.
+    """
+    w = max_x - min_x + 1
+    h = max_y - min_y + 1
+    labels = [None] * (w * h)
+    frontier = {}
+    for i, (x, y) in enumerate(locations):
+        at = (y - min_y) * w + (x - min_x)
+        frontier[at] = i if at not in frontier else TIE
+    while frontier:
+        for at, label in frontier.items():
+            labels[at] = label
+        reached = {}
+        for at, label in frontier.items():
+            x = at % w
+            for n in (at - w if at >= w else None,
+                      at + w if at + w < w * h else None,
+                      at - 1 if x > 0 else None,
+                      at + 1 if x < w - 1 else None):
+                if n is None or labels[n] is not None:
+                    continue
+                if reached.get(n, label) != label:
+                    reached[n] = TIE
+                else:
+                    reached[n] = label
+        frontier = reached
+    return labels, w
+
+
+def largest_area(locations):
+    """Return the size of the largest area that is nearest to one location
+    and is not infinite."""
+    min_x = min(x for x, y in locations)
+    max_x = max(x for x, y in locations)
+    min_y = min(y for x, y in locations)
+    max_y = max(y for x, y in locations)
+    labels, w = nearest(locations, min_x, min_y, max_x, max_y)
+
+    # An area that reaches the edge of the box goes on forever.
+    edges = labels[:w] + labels[-w:] + labels[::w] + labels[w - 1::w]
+    counts = collections.Counter(labels)
+    for label in set(edges) | {TIE}:
+        counts.pop(label, None)
+    return max(counts.values())
+
+
+def axis_totals(coordinates, lo, hi):
+    """Return the total distance from each of lo..hi to the coordinates."""
+    counts = collections.Counter(coordinates)
+    total = sum(abs(lo - c) for c in coordinates)
+    below = 0
+    totals = []
+    for v in range(lo, hi + 1):
+        totals.append(total)
+        below += counts[v]
+        # Stepping to v + 1 moves away from everything at or below v and
+        # towards everything above it.
+        total += below - (len(coordinates) - below)
+    return totals
+
+
+def safe_region(locations, threshold):
+    """Return how many cells have a total distance to all locations below
+    `threshold`."""
+    # Manhattan distance splits into a distance along x and one along y, so
+    # the total for (x, y) is the x total for x plus the y total for y.
+    # Cells further than this outside the locations are too far from every
+    # one of them.
+    margin = threshold // len(locations) + 1
+    xs = [x for x, y in locations]
+    ys = [y for x, y in locations]
+    x_totals = axis_totals(xs, min(xs) - margin, max(xs) + margin)
+    y_totals = sorted(axis_totals(ys, min(ys) - margin, max(ys) + margin))
+    return sum(bisect.bisect_left(y_totals, threshold - total) for total in x_totals)
+
+
+def solve(locations, threshold=10_000):
+    return [largest_area(locations), safe_region(locations, threshold)]
+
+
+def main():
+    with open('2018-day06-input.txt') as f:
+        locations = parse(f.read())
+    threshold = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    area, region = solve(locations, threshold)
+    print(area)
+    print(region)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,36 +1,67 @@
 #!/usr/bin/python3
 
-with open('2018-day08-input.txt') as f:
-    input = [int(x) for x in f.read().split()]
+import array
+import itertools
 
 
-#input = [int(x) for x in '2 3 0 3 10 11 12 1 1 0 1 99 2 1 1 2'.split()]
+def tokens(f, size=1 << 16):
+    """Yield the numbers in file `f`, reading it a chunk at a time."""
+    rest = ''
+    while True:
+        chunk = f.read(size)
+        if not chunk:
+            break
+        words = (rest + chunk).split()
+        # The last number may carry on into the next chunk.
+        rest = '' if chunk[-1].isspace() else words.pop()
+        yield from map(int, words)
+    if rest:
+        yield int(rest)
 
 
-class Tree:
+def analyse(numbers):
+    """Return the sum of all metadata and the value of the root node of the
+    tree in `numbers`, which can be any iterable of ints."""
+    numbers = iter(numbers)
+    total = 0
+    # One frame per node on the path from the root: how many of its children
+    # are still to come, its number of metadata entries, and the values of
+    # its children so far.
+    stack = [[next(numbers), next(numbers), []]]
+    while True:
+        frame = stack[-1]
+        if frame[0]:
+            frame[0] -= 1
+            stack.append([next(numbers), next(numbers), []])
+            continue
+        stack.pop()
+        _, num_metadata, children = frame
+        metadata = list(itertools.islice(numbers, num_metadata))
+        total += sum(metadata)
+        if children:
+            value = sum(children[i - 1] for i in metadata if 0 < i <= len(children))
+        else:
+            value = sum(metadata)
+        if not stack:
+            return total, value
+        stack[-1][2].append(value)
 
-    def __init__(self, children, metadata):
-        self.children = children
-        self.metadata = metadata
 
+def parse(text):
+    return array.array('i', map(int, text.split()))
 
-def parse_tree(input):
-    num_children = input.pop(0)
-    num_metadata = input.pop(0)
-    children = [parse_tree(input) for _ in range(num_children)]
-    metadata = [input.pop(0) for _ in range(num_metadata)]
-    return Tree(children, metadata)
 
+def solve(input):
+    return list(analyse(input))
 
-def compute_value(node):
-    if not node.children:
-        return sum(node.metadata)
-    value = 0
-    for i in node.metadata:
-        if 0 < i <= len(node.children):
-            value += compute_value(node.children[i - 1])
-    return value
 
+def main():
+    with open('2018-day08-input.txt') as f:
+        total, value = analyse(tokens(f))
+    print(total)
+    print(value)
+    # print(solve(parse('2 3 0 3 10 11 12 1 1 0 1 99 2 1 1 2')))
 
-tree = parse_tree(input)
-print(compute_value(tree))
+
+if __name__ == '__main__':
+    main()
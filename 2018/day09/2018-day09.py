@@ -1,55 +1,70 @@
 #!/usr/bin/python3
 
+import array
 import re
+import sys
 
 PARSE = re.compile(r'^(\d+) players; last marble is worth (\d+) points$')
 
-with open('2018-day09-input.txt') as f:
-    m = PARSE.search(f.read().strip())
-    players = int(m.group(1))
-    marbles = int(m.group(2))
-marbles *= 100
 
+def play(players, marbles, every=None):
+    """Play the game, yielding (marble, high score) after every `every`
+    marbles and once more after the last one."""
+    # The marbles clockwise and counter-clockwise of each marble. Marbles
+    # are numbered, so plain arrays of marble numbers hold the whole circle.
+    clockwise = array.array('I', [0]) * (marbles + 1)
+    counter_clockwise = array.array('I', [0]) * (marbles + 1)
+    scores = array.array('Q', [0]) * players
+    high_score = 0
+    current = 0
 
-class Node:
+    for marble in range(1, marbles + 1):
+        if marble % 23 == 0:
+            removed = current
+            for _ in range(7):
+                removed = counter_clockwise[removed]
+            before = counter_clockwise[removed]
+            current = clockwise[removed]
+            clockwise[before] = current
+            counter_clockwise[current] = before
+            player = (marble - 1) % players
+            scores[player] += marble + removed
+            if scores[player] > high_score:
+                high_score = scores[player]
+        else:
+            before = clockwise[current]
+            after = clockwise[before]
+            clockwise[before] = marble
+            counter_clockwise[marble] = before
+            clockwise[marble] = after
+            counter_clockwise[after] = marble
+            current = marble
+        if every and marble % every == 0 and marble != marbles:
+            yield marble, high_score
+    yield marbles, high_score
 
-    def __init__(self, marble):
-        self.marble = marble
-        self.next = self
-        self.prev = self
 
+def parse(text):
+    m = PARSE.search(text.strip())
+    return int(m.group(1)), int(m.group(2))
 
-class Circle:
 
-    def __init__(self):
-        self.circle = Node(0)
-        self.current_marble = self.circle
+def solve(game, scale=100):
+    players, marbles = game
+    for _, high_score in play(players, marbles * scale):
+        pass
+    return high_score
 
-    def insert(self, marble):
-        node = Node(marble)
-        node.next = self.current_marble.next.next
-        node.next.prev = node
-        node.prev = self.current_marble.next
-        node.prev.next = node
-        self.current_marble = node
 
-    def pop(self):
-        node = self.current_marble.prev.prev.prev.prev.prev.prev.prev
-        self.current_marble = node.next
-        node.prev.next = node.next
-        node.next.prev = node.prev
-        return node.marble
+def main():
+    with open('2018-day09-input.txt') as f:
+        players, marbles = parse(f.read())
+    every = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    for marble, high_score in play(players, marbles * 100, every):
+        if every:
+            print('%d: %d' % (marble, high_score))
+    print(high_score)
 
 
-circle = Circle()
-scores = {x: 0 for x in range(players)}
-current_player = 0
-
-
-for marble in range(1, marbles + 1):
-    if marble % 23 == 0:
-        scores[current_player] += marble + circle.pop()
-    else:
-        circle.insert(marble)
-    current_player = (current_player + 1) % players
-print(max(scores.values()))
+if __name__ == '__main__':
+    main()
@@ -16,31 +16,67 @@ class Star:
     def __repr__(self):
         return 'position=<%d, %d> velocity=<%d, %d>' % (self.x, self.y, self.dx, self.dy)
 
-    def tick(self, c):
-        self.x += self.dx * c
-        self.y += self.dy * c
+    def at(self, t):
+        return self.x + self.dx * t, self.y + self.dy * t
 
 
-stars = []
-with open('2018-day10-input.txt') as f:
-    for line in f:
+def parse(text):
+    stars = []
+    for line in text.splitlines():
         m = PARSE.search(line.strip())
         stars.append(Star(int(m.group(1)), int(m.group(2)), int(m.group(3)), int(m.group(4))))
+    return stars
 
-for star in stars:
-    star.tick(10_027)
-
-min_x = min(star.x for star in stars)
-min_y = min(star.y for star in stars)
-max_x = max(star.x for star in stars)
-max_y = max(star.y for star in stars)
-
-for y in range(min_y, max_y + 1):
-    for x in range(min_x, max_x + 1):
-        for star in stars:
-            if x == star.x and y == star.y:
-                print('#', end='')
-                break
-        else:
-            print('.', end='')
-    print('')
+
+def bounds(stars, t):
+    xs, ys = zip(*(star.at(t) for star in stars))
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def area(stars, t):
+    min_x, min_y, max_x, max_y = bounds(stars, t)
+    return (max_x - min_x + 1) * (max_y - min_y + 1)
+
+
+def alignment_time(stars):
+    """Return the time at which the stars are closest together."""
+    # The stars drifting up fastest and down fastest pass each other at
+    # about the time the message forms; from there, walk to the time with
+    # the smallest bounding box.
+    slowest = min(stars, key=lambda star: star.dy)
+    fastest = max(stars, key=lambda star: star.dy)
+    t = 0
+    if fastest.dy != slowest.dy:
+        t = max(0, round((slowest.y - fastest.y) / (fastest.dy - slowest.dy)))
+    while area(stars, t + 1) < area(stars, t):
+        t += 1
+    while t > 0 and area(stars, t - 1) < area(stars, t):
+        t -= 1
+    return t
+
+
+def render(stars, t):
+    min_x, min_y, max_x, max_y = bounds(stars, t)
+    rows = [['.'] * (max_x - min_x + 1) for _ in range(min_y, max_y + 1)]
+    for star in stars:
+        x, y = star.at(t)
+        rows[y - min_y][x - min_x] = '#'
+    return '\n'.join(''.join(row) for row in rows)
+
+
+def solve(stars):
+    """Return the message the stars spell out, and how long it takes to
+    appear."""
+    t = alignment_time(stars)
+    return [render(stars, t), t]
+
+
+def main():
+    with open('2018-day10-input.txt') as f:
+        message, t = solve(parse(f.read()))
+    print(message)
+    print(t)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,37 +1,75 @@
 #!/usr/bin/python3
 
-import collections
+SIZE = 300
+# The most power a single cell can have.
+MAX_POWER = 4
 
 
-def i(x, y):
+def power_level(x, y, serial):
     rack_id = x + 10
-    return (rack_id * y + 5235) * rack_id // 100 % 10 - 5
-
-
-I = collections.defaultdict(int)
-for x in range(1, 301):
-    for y in range(1, 301):
-        I[(x, y)] = (
-            i(x, y) +
-            I[(x + 0, y - 1)] +
-            I[(x - 1, y + 0)] -
-            I[(x - 1, y - 1)]
-        )
-
-max_coord = None
-max_power_level = float('-inf')
-for s in range(1, 301):
-    print(s)
-    for x in range(1, 301 - s):
-        for y in range(1, 301 - s):
-            p = (
-                I[(x + s, y + s)] +
-                I[(x + 0, y + 0)] -
-                I[(x + s, y + 0)] -
-                I[(x + 0, y + s)]
-            )
-            if p > max_power_level:
-                max_power_level = p
-                max_coord = (x, y, s)
-
-print(max_coord)
+    return (rack_id * y + serial) * rack_id // 100 % 10 - 5
+
+
+def summed_area_table(serial):
+    """Return rows where table[y][x] is the total power of the cells from
+    (1, 1) to (x, y). Row 0 and column 0 are zeros."""
+    table = [[0] * (SIZE + 1)]
+    for y in range(1, SIZE + 1):
+        above = table[-1]
+        row = [0]
+        total = 0
+        for x in range(1, SIZE + 1):
+            total += power_level(x, y, serial)
+            row.append(above[x] + total)
+        table.append(row)
+    return table
+
+
+def best_square(table, size):
+    """Return (power, x, y) of the size x size square with the most power."""
+    best = None
+    for y in range(SIZE - size + 1):
+        top = table[y]
+        bottom = table[y + size]
+        # The power of every square along this row at once.
+        sums = [d - c - b + a for a, b, c, d in zip(top, top[size:], bottom, bottom[size:])]
+        power = max(sums)
+        if best is None or power > best[0]:
+            best = (power, sums.index(power) + 1, y + 1)
+    return best
+
+
+def parse(text):
+    return int(text)
+
+
+def solve(serial):
+    """Return the (x, y, size) of the square with the most power.
+
+    Squares are tried from smallest to largest. A square holds a square of
+    any smaller size and some more cells, none of which can have more than
+    MAX_POWER, so a size is skipped when that bound from the last size
+    searched cannot beat the best square so far.
+    """
+    table = summed_area_table(serial)
+    best = None
+    last = None
+    for size in range(1, SIZE + 1):
+        if last is not None:
+            power, searched = last
+            if power + MAX_POWER * (size * size - searched * searched) <= best[0]:
+                continue
+        power, x, y = best_square(table, size)
+        last = (power, size)
+        if best is None or power > best[0]:
+            best = (power, x, y, size)
+    return best[1:]
+
+
+def main():
+    with open('input.txt') as f:
+        print(solve(parse(f.read())))
+
+
+if __name__ == '__main__':
+    main()
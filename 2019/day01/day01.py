@@ -1,6 +1,10 @@
 #!/usr/bin/python3 -tt
 # https://adventofcode.com/2019/day/1
 
+import functools
+
+
+@functools.lru_cache(maxsize=1 << 16)
 def needed_fuel(mass):
     fuel = mass // 3 - 2
     if fuel <= 0:
@@ -8,14 +12,29 @@ def needed_fuel(mass):
     return fuel + needed_fuel(fuel)
 
 
-def compute(mass_list):
-    return sum(needed_fuel(x) for x in mass_list)
+def compute(mass_list, batch=True):
+    """Return the fuel for all the modules, fuel for the fuel included.
+
+    The batch path takes one step of every module's chain of fuel at once,
+    dropping the chains that have run out, until none are left. Otherwise
+    each module goes through needed_fuel(), whose cache pays off when
+    masses (or the fuel their chains pass through) repeat.
+    """
+    if not batch:
+        return sum(needed_fuel(x) for x in mass_list)
+    total = 0
+    fuel = list(mass_list)
+    while fuel:
+        fuel = [x for x in [x // 3 - 2 for x in fuel] if x > 0]
+        total += sum(fuel)
+    return total
 
 
 def main():
     with open('input.txt') as f:
-        fuel = compute(int(x) for x in f)
-        assert fuel == 4982961
+        masses = [int(x) for x in f]
+        fuel = compute(masses)
+        assert fuel == compute(masses, batch=False) == 4982961
         print(fuel)
 
 
@@ -1,15 +1,8 @@
 #!/usr/bin/python3
 
-wires = []
-with open('2019-day03-input.txt') as f:
-    for line in f:
-        wires.append(line.strip().split(','))
-# wires = [
-#    'R8,U5,L5,D3'.split(','),
-#    'U7,R6,D4,L4'.split(','),
-# ]
-
-grid = {(0, 0): 0}
+import bisect
+import collections
+import itertools
 
 
 def distance(a, b):
@@ -25,42 +18,130 @@ def get_vector(direction):
     }[direction]
 
 
-def walk(wire, callback):
-    pos = (0, 0)
-    for step in wire:
-        vector = get_vector(step[0])
-        for _ in range(int(step[1:])):
-            pos = (pos[0] + vector[0], pos[1] + vector[1])
-            callback(pos)
-
-
-class Wire0Handler:
-
-    def __init__(self):
-        self.count = 0
+class Segment(collections.namedtuple('Segment', ['x', 'y', 'dx', 'dy', 'length', 'steps'])):
+    """A straight run of wire from (x, y), `steps` along the wire, going
+    `length` in direction (dx, dy)."""
 
-    def __call__(self, pos):
-        self.count += 1
-        if pos not in grid:
-            grid[pos] = self.count
+    __slots__ = ()
 
+    @property
+    def horizontal(self):
+        return self.dy == 0
 
-walk(wires[0], Wire0Handler())
+    def span(self):
+        """Return the lowest and highest coordinate covered along the run."""
+        start = self.x if self.horizontal else self.y
+        end = start + (self.dx + self.dy) * self.length
+        return min(start, end), max(start, end)
 
+    def steps_to(self, x, y):
+        return self.steps + abs(x - self.x) + abs(y - self.y)
 
-class Wire1Handler:
 
-    def __init__(self):
-        self.count = 0
-        self.shortest_total = float('inf')
-
-    def __call__(self, pos):
-        self.count += 1
-        if pos in grid:
-            self.shortest_total = min(self.shortest_total, grid[pos] + self.count)
-
-
-wire1handler = Wire1Handler()
-walk(wires[1], wire1handler)
-
-print(wire1handler.shortest_total)
+def segments(wire):
+    x = y = steps = 0
+    result = []
+    for step in wire:
+        dx, dy = get_vector(step[0])
+        length = int(step[1:])
+        result.append(Segment(x, y, dx, dy, length, steps))
+        x += dx * length
+        y += dy * length
+        steps += length
+    return result
+
+
+# Sweep events at the same x: horizontals are added before verticals are
+# checked against them, and removed after.
+ADD, CROSS, REMOVE = range(3)
+
+
+def crossings(wires):
+    """Yield (x, y, steps) for the points where two different wires meet,
+    where steps is the sum of both wires' steps to get there."""
+    horizontals = []
+    verticals = []
+    for i, wire in enumerate(wires):
+        for segment in segments(wire):
+            (horizontals if segment.horizontal else verticals).append((i, segment))
+
+    # A sweep from left to right, keeping the horizontals under the sweep
+    # line sorted by y so each vertical finds the ones it crosses by bisection.
+    events = []
+    for n, (_, segment) in enumerate(horizontals):
+        lo, hi = segment.span()
+        events.append((lo, ADD, n))
+        events.append((hi, REMOVE, n))
+    for n, (_, segment) in enumerate(verticals):
+        events.append((segment.x, CROSS, n))
+    events.sort()
+    active = []
+    for x, kind, n in events:
+        if kind == ADD:
+            bisect.insort(active, (horizontals[n][1].y, n))
+        elif kind == REMOVE:
+            active.remove((horizontals[n][1].y, n))
+        else:
+            i, vertical = verticals[n]
+            lo, hi = vertical.span()
+            start = bisect.bisect_left(active, (lo, -1))
+            end = bisect.bisect_right(active, (hi, len(horizontals)))
+            for y, m in active[start:end]:
+                j, horizontal = horizontals[m]
+                if i != j:
+                    yield x, y, vertical.steps_to(x, y) + horizontal.steps_to(x, y)
+
+    yield from _overlaps(horizontals, lambda segment: segment.y, lambda y, x: (x, y))
+    yield from _overlaps(verticals, lambda segment: segment.x, lambda x, y: (x, y))
+
+
+def _overlaps(segments, line, point):
+    """Yield crossings where runs of different wires lie along the same line.
+
+    Only the points of each overlap that can be best are yielded: its ends
+    (steps change linearly along it) and the points nearest the origin.
+    """
+    by_line = collections.defaultdict(list)
+    for i, segment in segments:
+        by_line[line(segment)].append((i, segment))
+    for c, group in by_line.items():
+        for (i, a), (j, b) in itertools.combinations(group, 2):
+            if i == j:
+                continue
+            lo = max(a.span()[0], b.span()[0])
+            hi = min(a.span()[1], b.span()[1])
+            if lo > hi:
+                continue
+            for t in {lo, hi} | {min(max(t, lo), hi) for t in (-1, 0, 1)}:
+                x, y = point(c, t)
+                yield x, y, a.steps_to(x, y) + b.steps_to(x, y)
+
+
+def parse(text):
+    return [line.strip().split(',') for line in text.splitlines()]
+
+
+def solve(wires):
+    """Return the distance from the origin to the closest crossing, and the
+    fewest combined steps to a crossing. Crossings between any two of the
+    wires count."""
+    closest = float('inf')
+    shortest_total = float('inf')
+    for x, y, steps in crossings(wires):
+        if (x, y) == (0, 0):
+            continue
+        closest = min(closest, distance((0, 0), (x, y)))
+        shortest_total = min(shortest_total, steps)
+    return [closest, shortest_total]
+
+
+def main():
+    with open('2019-day03-input.txt') as f:
+        closest, shortest_total = solve(parse(f.read()))
+        # closest, shortest_total = solve(parse('R8,U5,L5,D3\nU7,R6,D4,L4'))
+    print(closest)
+    print(shortest_total)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,42 +1,52 @@
 #!/usr/bin/python3
 
-
-def exactly2(n):
-    for x in range(10):
-        if str(x) * 2 not in n:
-            continue
-        if str(x) * 3 in n:
-            continue
-        if str(x) * 4 in n:
-            continue
-        if str(x) * 5 in n:
-            continue
-        if str(x) * 6 in n:
-            continue
-        return True
-    return False
-
-
-def ok(n):
-    n = str(n)
-    if len(n) != 6:
-        return False
-    if not exactly2(n):
-        return False
-    if not all(n[i] <= n[i + 1] for i in range(5)):
-        return False
-    return True
-
-# print(ok(112233))
-# print(ok(123444))
-# print(ok(111122))
-
-
-lb = 172930
-ub = 683082
-
-count = 0
-for n in range(lb, ub + 1):
-    if ok(n):
-        count += 1
-print(count)
+import itertools
+import sys
+
+
+def count(lb, ub):
+    """Return how many passwords in lb..ub have some run of two or more
+    equal digits (part 1), and how many have a run of exactly two (part 2).
+
+    Only numbers whose digits never decrease are passwords. Those are the
+    multisets of digits written in order, so they are generated directly
+    instead of scanning the whole range; there are only C(n + 8, 8) of
+    them with n digits (1-9 only, as a 0 could only come first).
+    """
+    part1 = 0
+    part2 = 0
+    for length in range(len(str(lb)), len(str(ub)) + 1):
+        for digits in itertools.combinations_with_replacement('123456789', length):
+            n = int(''.join(digits))
+            if n < lb:
+                continue
+            if n > ub:
+                break
+            runs = {sum(1 for _ in group) for _, group in itertools.groupby(digits)}
+            part1 += max(runs) >= 2
+            part2 += 2 in runs
+    return part1, part2
+
+
+def parse(text):
+    lb, ub = text.strip().split('-')
+    return int(lb), int(ub)
+
+
+def solve(bounds):
+    return list(count(*bounds))
+
+
+def main():
+    if len(sys.argv) > 2:
+        bounds = int(sys.argv[1]), int(sys.argv[2])
+    else:
+        with open('input.txt') as f:
+            bounds = parse(f.read())
+    part1, part2 = solve(bounds)
+    print(part1)
+    print(part2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,103 +1,14 @@
 #!/usr/bin/python3
 
 import asyncio
-import collections
+import concurrent.futures
 import itertools
+import os
+import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 
-class IntcodeComputer:
-
-    def __init__(self, program, input_queue, output_queue):
-        self.program = program
-        self.input_queue = input_queue
-        self.output_queue = output_queue
-        self.ip = 0
-        self.halted = False
-
-    async def run(self):
-        while not self.halted:
-            await self.step()
-
-    async def step(self):
-        opcode, modes = self._decode(self._advance_ip())
-        await {
-            1: lambda: self._add(modes),
-            2: lambda: self._multiply(modes),
-            3: lambda: self._input(),
-            4: lambda: self._output(modes),
-            5: lambda: self._jump_if_true(modes),
-            6: lambda: self._jump_if_false(modes),
-            7: lambda: self._less_than(modes),
-            8: lambda: self._equals(modes),
-            99: lambda: self._hlt(),
-        }[opcode]()
-
-    def _advance_ip(self):
-        value = self.program[self.ip]
-        self.ip += 1
-        return value
-
-    def _decode(self, instr):
-        opcode = instr % 100
-        instr //= 100
-        modes = collections.defaultdict(int)
-        while instr > 0:
-            modes[len(modes)] = instr % 10
-            instr //= 10
-        return opcode, modes
-
-    def _get_int(self, at, mode):
-        return {
-            0: lambda: self.program[at],
-            1: lambda: at,
-        }[mode]()
-
-    async def _add(self, modes):
-        a = self._get_int(self._advance_ip(), modes[0])
-        b = self._get_int(self._advance_ip(), modes[1])
-        d = self._advance_ip()
-        self.program[d] = a + b
-
-    async def _multiply(self, modes):
-        a = self._get_int(self._advance_ip(), modes[0])
-        b = self._get_int(self._advance_ip(), modes[1])
-        d = self._advance_ip()
-        self.program[d] = a * b
-
-    async def _input(self):
-        d = self._advance_ip()
-        self.program[d] = await self.input_queue.get()
-
-    async def _output(self, modes):
-        a = self._get_int(self._advance_ip(), modes[0])
-        await self.output_queue.put(a)
-
-    async def _jump_if_true(self, modes):
-        p = self._get_int(self._advance_ip(), modes[0])
-        d = self._get_int(self._advance_ip(), modes[1])
-        if p != 0:
-            self.ip = d
-
-    async def _jump_if_false(self, modes):
-        p = self._get_int(self._advance_ip(), modes[0])
-        d = self._get_int(self._advance_ip(), modes[1])
-        if p == 0:
-            self.ip = d
-
-    async def _less_than(self, modes):
-        a = self._get_int(self._advance_ip(), modes[0])
-        b = self._get_int(self._advance_ip(), modes[1])
-        d = self._advance_ip()
-        self.program[d] = 1 if a < b else 0
-
-    async def _equals(self, modes):
-        a = self._get_int(self._advance_ip(), modes[0])
-        b = self._get_int(self._advance_ip(), modes[1])
-        d = self._advance_ip()
-        self.program[d] = 1 if a == b else 0
-
-    async def _hlt(self):
-        self.halted = True
+from intcode import IntcodeComputer
 
 
 async def evaluate(program, permutation):
@@ -124,11 +35,36 @@ async def evaluate(program, permutation):
     return await input_a.get()
 
 
+# The program each pool worker was started with, so tasks only need to carry
+# their permutation.
+_worker_program = None
+
+
+def _init_worker(program):
+    global _worker_program
+    _worker_program = program
+
+
+def _evaluate_in_worker(permutation):
+    return asyncio.run(evaluate(_worker_program, permutation))
+
+
+def search(program, workers=None):
+    """Return the highest thruster signal over all phase permutations, spread
+    across `workers` processes (all CPUs by default, in-process if 1)."""
+    permutations = itertools.permutations(range(5, 10))
+    if workers == 1:
+        return max(asyncio.run(evaluate(program, x)) for x in permutations)
+    with concurrent.futures.ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(program,)) as executor:
+        return max(executor.map(_evaluate_in_worker, permutations, chunksize=8))
+
+
 def main():
     with open('input.txt') as f:
         program = [int(x) for x in f.read().strip().split(',')]
-    permutations = itertools.permutations(range(5, 10))
-    print(max(asyncio.run(evaluate(program, x)) for x in permutations))
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    print(search(program, workers))
 
 
 if __name__ == '__main__':
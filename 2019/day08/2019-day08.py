@@ -2,20 +2,31 @@
 
 import collections
 
-with open('2019-day08-input.txt') as f:
-    inp = [int(x) for x in f.read().strip()]
-
 WIDTH = 25
 HEIGHT = 6
 
-raster = collections.defaultdict(lambda: 2)
-for i, v in enumerate(inp):
-    x = (i % (WIDTH * HEIGHT)) % WIDTH
-    y = (i % (WIDTH * HEIGHT)) // WIDTH
-    if raster[(x, y)] == 2:
-        raster[(x, y)] = v
-
-for i, v in enumerate(raster):
-    x = i % WIDTH
-    y = i // WIDTH
-    print('x' if raster[(x, y)] == 1 else ' ', end='\n' if x == 24 else '')
+
+def parse(text):
+    return [int(x) for x in text.strip()]
+
+
+def solve(inp):
+    raster = collections.defaultdict(lambda: 2)
+    for i, v in enumerate(inp):
+        x = (i % (WIDTH * HEIGHT)) % WIDTH
+        y = (i % (WIDTH * HEIGHT)) // WIDTH
+        if raster[(x, y)] == 2:
+            raster[(x, y)] = v
+
+    return '\n'.join(
+        ''.join('x' if raster[(x, y)] == 1 else ' ' for x in range(WIDTH))
+        for y in range(HEIGHT))
+
+
+def main():
+    with open('2019-day08-input.txt') as f:
+        print(solve(parse(f.read())))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,137 +1,13 @@
 #!/usr/bin/python3
 
 import asyncio
-import collections
 import itertools
+import os
+import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 
-class IntcodeComputer:
-
-    def __init__(self, program, input_queue, output_queue):
-        self.program = program
-        self.input_queue = input_queue
-        self.output_queue = output_queue
-        self.ip = 0
-        self.relative_base = 0
-        self.halted = asyncio.Event()
-
-    @property
-    def finished(self):
-        return self.halted.is_set() and self.output_queue.empty()
-
-    async def run(self):
-        while not self.halted.is_set():
-            await self.step()
-
-    async def step(self):
-        opcode, modes = self._decode(self._advance_ip())
-        await {
-            1: lambda: self._add(modes),
-            2: lambda: self._multiply(modes),
-            3: lambda: self._input(modes),
-            4: lambda: self._output(modes),
-            5: lambda: self._jump_if_true(modes),
-            6: lambda: self._jump_if_false(modes),
-            7: lambda: self._less_than(modes),
-            8: lambda: self._equals(modes),
-            9: lambda: self._relative_base_offset(modes),
-            99: lambda: self._hlt(),
-        }[opcode]()
-
-    def _advance_ip(self):
-        value = self.program[self.ip]
-        self.ip += 1
-        return value
-
-    def _decode(self, instr):
-        opcode = instr % 100
-        instr //= 100
-        modes = collections.defaultdict(int)
-        while instr > 0:
-            modes[len(modes)] = instr % 10
-            instr //= 10
-        return opcode, modes
-
-    def _read(self, at, mode):
-        if mode == 0:
-            self._extend_program(at)
-            return self.program[at]
-        if mode == 1:
-            return at
-        if mode == 2:
-            at = self.relative_base + at
-            self._extend_program(at)
-            return self.program[at]
-        raise ValueError('bad read mode')
-
-    def _write(self, at, mode, value):
-        if mode == 0:
-            self._extend_program(at)
-            self.program[at] = value
-            return
-        if mode == 1:
-            raise ValueError('write with mode=1 not allowed')
-        if mode == 2:
-            at = self.relative_base + at
-            self._extend_program(at)
-            self.program[at] = value
-            return
-        raise ValueError('bad write mode')
-
-    def _extend_program(self, at):
-        while at >= len(self.program):
-            self.program.append(0)
-
-    async def _add(self, modes):
-        a = self._read(self._advance_ip(), modes[0])
-        b = self._read(self._advance_ip(), modes[1])
-        d = self._advance_ip()
-        self._write(d, modes[2], a + b)
-
-    async def _multiply(self, modes):
-        a = self._read(self._advance_ip(), modes[0])
-        b = self._read(self._advance_ip(), modes[1])
-        d = self._advance_ip()
-        self._write(d, modes[2], a * b)
-
-    async def _input(self, modes):
-        d = self._advance_ip()
-        self._write(d, modes[0], await self.input_queue.get())
-
-    async def _output(self, modes):
-        a = self._read(self._advance_ip(), modes[0])
-        await self.output_queue.put(a)
-
-    async def _jump_if_true(self, modes):
-        p = self._read(self._advance_ip(), modes[0])
-        d = self._read(self._advance_ip(), modes[1])
-        if p != 0:
-            self.ip = d
-
-    async def _jump_if_false(self, modes):
-        p = self._read(self._advance_ip(), modes[0])
-        d = self._read(self._advance_ip(), modes[1])
-        if p == 0:
-            self.ip = d
-
-    async def _less_than(self, modes):
-        a = self._read(self._advance_ip(), modes[0])
-        b = self._read(self._advance_ip(), modes[1])
-        d = self._advance_ip()
-        self._write(d, modes[2], 1 if a < b else 0)
-
-    async def _equals(self, modes):
-        a = self._read(self._advance_ip(), modes[0])
-        b = self._read(self._advance_ip(), modes[1])
-        d = self._advance_ip()
-        self._write(d, modes[2], 1 if a == b else 0)
-
-    async def _relative_base_offset(self, modes):
-        a = self._read(self._advance_ip(), modes[0])
-        self.relative_base += a
-
-    async def _hlt(self):
-        self.halted.set()
+from intcode import CompiledIntcodeComputer, Profiler
 
 
 async def send_line(computer, line):
@@ -145,6 +21,9 @@ async def recv_line(computer):
     while True:
         output = await computer.output_queue.get()
         print(output)
+        if output > 127:
+            # Past ASCII: the amount of dust collected, which ends the output.
+            return None
         output = chr(output)
         if output == '\n':
             return ''.join(line)
@@ -155,6 +34,8 @@ async def recv_grid(computer):
     grid = {}
     for y in itertools.count():
         line = await recv_line(computer)
+        if line is None:
+            return None
         if line == '':
             break
         for x, ch in enumerate(line):
@@ -216,7 +97,10 @@ async def execute(computer):
     while not computer.finished:
         print_grid(grid)
         grid[robot_pos] = '%'
-        robot_pos, robot = find_robot(await recv_grid(computer))
+        next_grid = await recv_grid(computer)
+        if next_grid is None:
+            break
+        robot_pos, robot = find_robot(next_grid)
         grid[robot_pos] = robot
 
 
@@ -235,16 +119,22 @@ def print_grid(grid):
     print()
 
 
-async def run(program):
+async def run(program, profiler=None):
     program[0] = 2
-    computer = IntcodeComputer(program, asyncio.Queue(), asyncio.Queue())
+    computer = CompiledIntcodeComputer(program, asyncio.Queue(), asyncio.Queue(), profiler)
     await asyncio.gather(computer.run(), execute(computer))
 
 
 def main():
     with open('input.txt') as f:
         program = [int(x) for x in f.read().split(',')]
-    asyncio.run(run(program))
+    # An optional argument turns on profiling and names the report files.
+    profiler = Profiler() if len(sys.argv) > 1 else None
+    try:
+        asyncio.run(run(program, profiler))
+    finally:
+        if profiler is not None:
+            profiler.save(sys.argv[1])
 
 
 if __name__ == '__main__':
@@ -56,10 +56,7 @@ def find_shortest_distance(grid, starts, acquired_keys, memo={}):
     return min_distance
 
 
-def main():
-    with open('input.txt') as f:
-        inp = f.read().strip().splitlines()
-
+def parse(inp):
     grid = {}
     initial_x, initial_y = None, None
     for y, line in enumerate(inp):
@@ -87,7 +84,14 @@ def main():
     # starts = {
     #     1: (initial_x, initial_y),
     # }
+    return grid, starts
+
+
+def main():
+    with open('input.txt') as f:
+        inp = f.read().strip().splitlines()
 
+    grid, starts = parse(inp)
     print(find_shortest_distance(grid, starts, frozenset()))
 
 
@@ -1,173 +1,187 @@
 #!/usr/bin/python3
 
 import asyncio
-import collections
-
-
-class IntcodeComputer:
-
-    def __init__(self, program, input_queue, output_queue):
-        self.program = program
-        self.input_queue = input_queue
-        self.output_queue = output_queue
-        self.ip = 0
-        self.relative_base = 0
-        self.halted = asyncio.Event()
-
-    @property
-    def finished(self):
-        return self.halted.is_set() and self.output_queue.empty()
-
-    async def run(self):
-        while not self.halted.is_set():
-            await self.step()
-
-    async def step(self):
-        opcode, modes = self._decode(self._advance_ip())
-        await {
-            1: lambda: self._add(modes),
-            2: lambda: self._multiply(modes),
-            3: lambda: self._input(modes),
-            4: lambda: self._output(modes),
-            5: lambda: self._jump_if_true(modes),
-            6: lambda: self._jump_if_false(modes),
-            7: lambda: self._less_than(modes),
-            8: lambda: self._equals(modes),
-            9: lambda: self._relative_base_offset(modes),
-            99: lambda: self._hlt(),
-        }[opcode]()
-
-    def _advance_ip(self):
-        value = self.program[self.ip]
-        self.ip += 1
-        return value
-
-    def _decode(self, instr):
-        opcode = instr % 100
-        instr //= 100
-        modes = collections.defaultdict(int)
-        while instr > 0:
-            modes[len(modes)] = instr % 10
-            instr //= 10
-        return opcode, modes
-
-    def _read(self, at, mode):
-        if mode == 0:
-            self._extend_program(at)
-            return self.program[at]
-        if mode == 1:
-            return at
-        if mode == 2:
-            at = self.relative_base + at
-            self._extend_program(at)
-            return self.program[at]
-        raise ValueError('bad read mode')
-
-    def _write(self, at, mode, value):
-        if mode == 0:
-            self._extend_program(at)
-            self.program[at] = value
-            return
-        if mode == 1:
-            raise ValueError('write with mode=1 not allowed')
-        if mode == 2:
-            at = self.relative_base + at
-            self._extend_program(at)
-            self.program[at] = value
-            return
-        raise ValueError('bad write mode')
-
-    def _extend_program(self, at):
-        while at >= len(self.program):
-            self.program.append(0)
-
-    async def _add(self, modes):
-        a = self._read(self._advance_ip(), modes[0])
-        b = self._read(self._advance_ip(), modes[1])
-        d = self._advance_ip()
-        self._write(d, modes[2], a + b)
-
-    async def _multiply(self, modes):
-        a = self._read(self._advance_ip(), modes[0])
-        b = self._read(self._advance_ip(), modes[1])
-        d = self._advance_ip()
-        self._write(d, modes[2], a * b)
-
-    async def _input(self, modes):
-        d = self._advance_ip()
-        self._write(d, modes[0], await self.input_queue.get())
-
-    async def _output(self, modes):
-        a = self._read(self._advance_ip(), modes[0])
-        await self.output_queue.put(a)
-
-    async def _jump_if_true(self, modes):
-        p = self._read(self._advance_ip(), modes[0])
-        d = self._read(self._advance_ip(), modes[1])
-        if p != 0:
-            self.ip = d
-
-    async def _jump_if_false(self, modes):
-        p = self._read(self._advance_ip(), modes[0])
-        d = self._read(self._advance_ip(), modes[1])
-        if p == 0:
-            self.ip = d
-
-    async def _less_than(self, modes):
-        a = self._read(self._advance_ip(), modes[0])
-        b = self._read(self._advance_ip(), modes[1])
-        d = self._advance_ip()
-        self._write(d, modes[2], 1 if a < b else 0)
-
-    async def _equals(self, modes):
-        a = self._read(self._advance_ip(), modes[0])
-        b = self._read(self._advance_ip(), modes[1])
-        d = self._advance_ip()
-        self._write(d, modes[2], 1 if a == b else 0)
-
-    async def _relative_base_offset(self, modes):
-        a = self._read(self._advance_ip(), modes[0])
-        self.relative_base += a
-
-    async def _hlt(self):
-        self.halted.set()
-
-
-async def inbeam(program, x, y):
-    computer = IntcodeComputer(program.copy(), asyncio.Queue(), asyncio.Queue())
-    await computer.input_queue.put(x)
-    await computer.input_queue.put(y)
-    await computer.run()
-    return await computer.output_queue.get() == 1
-
-
-async def run(program):
-    x, y = 0, 0
-    while True:
-        print(x, y)
-        while True:
-            tr = await inbeam(program, x + 99, y)
-            if not tr:
-                break
-            bl = await inbeam(program, x +  0, y + 99)
-            br = await inbeam(program, x + 99, y + 99)
-            if bl and br:
-                print(x * 10_000 + y)
-                return
-            x += 1
-        y += 1
-        while True:
-            tl = await inbeam(program, x, y)
-            if not tl:
-                break
-            x -= 1
-        x += 1
+import concurrent.futures
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from intcode import IntcodeComputer
+
+# How far outside its estimated edge a row is first probed.
+EDGE_PADDING = 4
+# A row is searched out to column MAX_SLOPE * y before the beam counts as
+# missing it; that allows for a beam almost flat along the x axis.
+MAX_SLOPE = 16
+
+
+def prime(program):
+    # Every probe runs the same setup code before asking for coordinates, so
+    # run it once and fork each probe from there.
+    drone = IntcodeComputer(program, asyncio.Queue(), asyncio.Queue())
+    drone.run_until_blocked()
+    return drone
+
+
+def inbeam(drone, x, y):
+    if x < 0 or y < 0:
+        return False
+    computer = drone.fork()
+    computer.input_queue.put_nowait(x)
+    computer.input_queue.put_nowait(y)
+    computer.run_until_blocked()
+    return computer.output_queue.get_nowait() == 1
+
+
+# The primed drone of each pool worker, so tasks only need to carry points.
+_worker_drone = None
+
+
+def _init_worker(program):
+    global _worker_drone
+    _worker_drone = prime(program)
+
+
+def _inbeam_in_worker(points):
+    return [inbeam(_worker_drone, x, y) for x, y in points]
+
+
+class BeamScanner:
+
+    def __init__(self, program, workers=None):
+        self._drone = prime(program)
+        self._workers = workers or os.cpu_count()
+        self._executor = None
+        if self._workers > 1:
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                self._workers, initializer=_init_worker, initargs=(program,))
+        self._rows = {}
+        self._slopes = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def inbeam_many(self, points):
+        points = list(points)
+        if self._executor is None or len(points) < self._workers:
+            return [inbeam(self._drone, x, y) for x, y in points]
+        size = -(-len(points) // self._workers)
+        chunks = [points[i:i + size] for i in range(0, len(points), size)]
+        return [r for results in self._executor.map(_inbeam_in_worker, chunks) for r in results]
+
+    def row(self, y):
+        """Return the (left, right) columns the beam covers on row y, or None
+        if the beam misses the row."""
+        if y not in self._rows:
+            self._rows[y] = self._find_row(y)
+        return self._rows[y]
+
+    def calibrate(self, y):
+        """Scan row y in full and use it to estimate where later rows are."""
+        row = self.row(y)
+        if row is not None:
+            self._slopes = (row[0] / y, row[1] / y)
+
+    def _find_row(self, y):
+        if self._slopes is None:
+            return self._scan_row(y)
+        left = int(self._slopes[0] * y) - EDGE_PADDING
+        right = int(self._slopes[1] * y) + EDGE_PADDING
+        mid = (left + right) // 2
+        left_in, mid_in, right_in = self.inbeam_many([(left, y), (mid, y), (right, y)])
+        if not mid_in:
+            return self._scan_row(y)
+        left, left_inside = self._gallop(y, left, left_in, mid, -1)
+        right, right_inside = self._gallop(y, right, right_in, mid, 1)
+        return self._edge(y, left, left_inside), self._edge(y, right, right_inside)
+
+    def _scan_row(self, y):
+        # Look for the beam nearest the emitter first, in batches of doubling
+        # width, then gallop from the last hit to find the far edge.
+        start = 0
+        width = max(self._workers, EDGE_PADDING)
+        while start <= MAX_SLOPE * y:
+            xs = range(start, start + width)
+            hits = [x for x, hit in zip(xs, self.inbeam_many((x, y) for x in xs)) if hit]
+            if hits:
+                if hits[-1] < xs[-1]:
+                    return hits[0], hits[-1]
+                outside, inside = self._gallop(y, hits[-1], True, hits[-1], 1)
+                return hits[0], self._edge(y, outside, inside)
+            start += width
+            width *= 2
+        return None
+
+    def _gallop(self, y, x, hit, inside, direction):
+        """Step away from `inside` on row y, starting at x, until outside the
+        beam. Return the first column found outside and the last one inside.
+
+        The step doubles every round, and each round spreads one probe per
+        worker evenly over the step."""
+        step = EDGE_PADDING
+        while hit:
+            inside = x
+            count = min(self._workers, step)
+            xs = [x + direction * (step * i // count) for i in range(1, count + 1)]
+            step *= 2
+            for x, hit in zip(xs, self.inbeam_many((x, y) for x in xs)):
+                if not hit:
+                    break
+                inside = x
+        return x, inside
+
+    def _edge(self, y, outside, inside):
+        """Return the last beam column on row y going from `inside` towards `outside`."""
+        direction = 1 if outside > inside else -1
+        while abs(outside - inside) > 1:
+            # Probe several evenly spaced columns per round, one per worker.
+            count = min(self._workers, abs(outside - inside) - 1)
+            xs = [inside + direction * (abs(outside - inside) * i // (count + 1)) for i in range(1, count + 1)]
+            for x, hit in zip(xs, self.inbeam_many((x, y) for x in xs)):
+                if not hit:
+                    outside = x
+                    break
+                inside = x
+        return inside
+
+
+def find_square(scanner, size):
+    """Return the top-left corner of the first size x size square that fits in the beam."""
+    def fits(y):
+        top = scanner.row(y)
+        bottom = scanner.row(y + size - 1)
+        if top is None or bottom is None:
+            return None
+        x = max(top[0], bottom[0])
+        if x + size - 1 <= min(top[1], bottom[1]):
+            return x
+        return None
+
+    scanner.calibrate(size)
+    lo, hi = size, size
+    while fits(hi) is None:
+        lo, hi = hi, hi * 2
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if fits(mid) is None:
+            lo = mid
+        else:
+            hi = mid
+    return fits(hi), hi
 
 
 def main():
     with open('input.txt') as f:
         program = [int(x) for x in f.read().split(',')]
-    asyncio.run(run(program))
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    with BeamScanner(program, workers) as scanner:
+        x, y = find_square(scanner, 100)
+    print(x * 10_000 + y)
 
 
 if __name__ == '__main__':
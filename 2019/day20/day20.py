@@ -31,10 +31,7 @@ def shortest(grid, portals, w, h, src, dst):
                 q.append(((nx, ny), newlevel, dist + 1))
 
 
-def main():
-    with open('input.txt') as f:
-        inp = f.read().strip('\n').splitlines()
-
+def parse(inp):
     grid = {}
     for y, line in enumerate(inp):
         for x, ch in enumerate(line):
@@ -60,7 +57,14 @@ def main():
                     portals.setdefault(c, []).append((x - 1, y))
                 elif x < w - 2 and grid[x + 2, y] == '.':
                     portals.setdefault(c, []).append((x + 2, y))
-    del x, y
+    return grid, portals, w, h
+
+
+def main():
+    with open('input.txt') as f:
+        inp = f.read().strip('\n').splitlines()
+
+    grid, portals, w, h = parse(inp)
 
     src = portals['AA'][0]
     dst = portals['ZZ'][0]
@@ -0,0 +1,4 @@
+from .compiler import CompiledIntcodeComputer
+from .computer import IntcodeComputer
+from .memory import Memory
+from .profiler import Profiler
@@ -0,0 +1,264 @@
+import collections
+import functools
+
+from .computer import IntcodeComputer
+
+# How many times an address must be entered by the interpreter before the
+# block starting there is compiled. Code that only runs a few times (set-up
+# code, or straight-line programs that rewrite themselves as they go) is not
+# worth compiling.
+HOT_THRESHOLD = 16
+
+
+class CompiledIntcodeComputer(IntcodeComputer):
+    """An IntcodeComputer that compiles basic blocks to Python functions.
+
+    A block runs from its entry address up to and including the first jump or
+    halt, with every parameter mode baked into the generated code. Compiled
+    blocks are cached by entry address. A write into a compiled block drops it
+    (and ends the running block early if that was the one written to), so
+    self-modifying programs still see their own writes. Addresses are
+    interpreted until they have been entered HOT_THRESHOLD times.
+    """
+
+    def __init__(self, program, input_queue=None, output_queue=None, profiler=None):
+        super().__init__(program, input_queue, output_queue, profiler)
+        self._reset_blocks()
+
+    def restore(self, snapshot):
+        super().restore(snapshot)
+        self._instructions = {}
+        self._reset_blocks()
+
+    def run_until_blocked(self):
+        if self.profiler is not None:
+            super().run_until_blocked()
+            return
+        halted = self.halted
+        blocks = self._blocks
+        heat = self._heat
+        while not halted.is_set():
+            block = blocks.get(self.ip)
+            if block is None:
+                heat[self.ip] += 1
+                if heat[self.ip] < HOT_THRESHOLD:
+                    if not self._interpret():
+                        return
+                    continue
+                block = self._compile(self.ip)
+            self.ip = block(self, self.program, self._code, self.input_queue, self.output_queue)
+            if self._blocked:
+                self._blocked = False
+                return
+
+    def _interpret(self):
+        """Execute one instruction, unless it would block on a queue."""
+        opcode, handler, modes, params = self._fetch()
+        if opcode == 3 and self.input_queue.empty():
+            return False
+        if opcode == 4 and self.output_queue.full():
+            return False
+        self.ip += len(params) + 1
+        handler(self, modes, params)
+        return True
+
+    def _reset_blocks(self):
+        self._blocks = {}
+        self._extents = {}
+        # Maps each address inside a compiled block to the entry addresses of
+        # the blocks covering it, or to None for an instruction the
+        # interpreter has decoded.
+        self._code = {}
+        self._heat = collections.defaultdict(int)
+        self._blocked = False
+
+    def _compile(self, start):
+        lines, end, live, next_ips = _translate(self.program, start)
+        block = _build(start, '\n'.join(lines), next_ips)
+        self._blocks[start] = block
+        self._extents[start] = end
+        for at in range(start, end):
+            if at not in live:
+                self._code.setdefault(at, set()).add(start)
+        return block
+
+    def _decode(self, ip):
+        instruction = super()._decode(ip)
+        for at in range(ip, ip + len(instruction[3]) + 1):
+            self._code.setdefault(at, set()).add(None)
+        return instruction
+
+    def _store(self, at, value):
+        super()._store(at, value)
+        if at in self._code:
+            self._invalidate(at)
+
+    def _invalidate(self, at, current=None):
+        """Drop every compiled block covering `at`, and report whether the
+        block with entry address `current` was one of them."""
+        starts = self._code.pop(at, set())
+        for start in starts:
+            if start is None:
+                continue
+            del self._blocks[start]
+            self._heat[start] = 0
+            for covered in range(start, self._extents.pop(start)):
+                owners = self._code.get(covered)
+                if owners is not None:
+                    owners.discard(start)
+                    if not owners:
+                        del self._code[covered]
+        for ip in range(at - self.MAX_PARAMS, at + 1):
+            self._instructions.pop(ip, None)
+        return current is not None and current in starts
+
+
+def _read(param, mode):
+    if mode == 0:
+        return 'mem[%s]' % param
+    if mode == 1:
+        return param
+    if mode == 2:
+        return 'mem[rb + %s]' % param
+    # Only fail if the read really happens: the block may rewrite this
+    # instruction before it gets here.
+    return 'bad_read_mode()'
+
+
+def _bad_read_mode():
+    raise ValueError('bad read mode')
+
+
+def _exit(ip):
+    return ['    return %d' % ip]
+
+
+def _write(start, next_ip, param, mode, value):
+    if mode == 0 and param.isdigit():
+        at = param
+        lines = []
+    elif mode == 0:
+        at = 'at'
+        lines = ['    at = %s' % param]
+    elif mode == 2:
+        at = 'at'
+        lines = ['    at = rb + %s' % param]
+    else:
+        # The interpreter reads the operands before it looks at the write
+        # mode, so a bad read mode is the error reported.
+        error = 'write with mode=1 not allowed' if mode == 1 else 'bad write mode'
+        return ['    value = %s' % value, "    raise ValueError('%s')" % error]
+    lines.append('    mem[%s] = %s' % (at, value))
+    lines.append('    if %s in code and vm._invalidate(%s, %d):' % (at, at, start))
+    lines.extend('    ' + line for line in _exit(next_ip))
+    return lines
+
+
+def _decode_block(program, start):
+    """Return the (ip, opcode, modes, params) of each instruction in the block
+    entered at `start`, and the address just past the block."""
+    instructions = []
+    ip = start
+    while True:
+        instr = program[ip]
+        opcode = instr % 100
+        if opcode not in IntcodeComputer.OPCODES:
+            if ip == start:
+                raise ValueError('bad opcode %d at %d' % (instr, ip))
+            # Whatever follows may be data; stop here and let the next block
+            # fail only if execution really gets this far.
+            return instructions, ip
+        arity = IntcodeComputer.OPCODES[opcode][1]
+        modes = [instr // 10 ** (i + 2) % 10 for i in range(arity)]
+        params = [program[ip + i] for i in range(1, arity + 1)]
+        instructions.append((ip, opcode, modes, params))
+        ip += arity + 1
+        if opcode in (5, 6, 99):
+            return instructions, ip
+
+
+def _translate(program, start):
+    """Return the body of the block entered at `start`, the address just past
+    its last instruction, the parameter addresses it reads live, and for
+    each line of the body the address just past the instruction it is part
+    of.
+
+    Intcode has no indirect addressing, so programs index arrays by writing
+    an address into a later instruction's parameter. Parameters that the
+    block itself writes to are read from memory when they are used instead
+    of being baked in, which keeps such blocks from invalidating themselves.
+    """
+    instructions, end = _decode_block(program, start)
+    targets = {params[-1] for _, opcode, modes, params in instructions
+               if opcode in (1, 2, 3, 7, 8) and modes[-1] == 0}
+    live = set()
+    for ip, _, _, params in instructions:
+        live.update(at for at in range(ip + 1, ip + 1 + len(params)) if at in targets)
+
+    lines = []
+    next_ips = []
+    for ip, opcode, modes, params in instructions:
+        params = ['mem[%d]' % at if at in live else '%d' % param
+                  for at, param in enumerate(params, ip + 1)]
+        next_ip = ip + len(params) + 1
+        if opcode in (1, 2, 7, 8):
+            a = _read(params[0], modes[0])
+            b = _read(params[1], modes[1])
+            value = {
+                1: '%s + %s' % (a, b),
+                2: '%s * %s' % (a, b),
+                7: '1 if %s < %s else 0' % (a, b),
+                8: '1 if %s == %s else 0' % (a, b),
+            }[opcode]
+            lines.extend(_write(start, next_ip, params[2], modes[2], value))
+        elif opcode == 3:
+            lines.append('    if inq.empty():')
+            lines.append('        vm._blocked = True')
+            lines.extend('    ' + line for line in _exit(ip))
+            lines.extend(_write(start, next_ip, params[0], modes[0], 'inq.get_nowait()'))
+        elif opcode == 4:
+            lines.append('    if outq.full():')
+            lines.append('        vm._blocked = True')
+            lines.extend('    ' + line for line in _exit(ip))
+            lines.append('    outq.put_nowait(%s)' % _read(params[0], modes[0]))
+        elif opcode in (5, 6):
+            # Like the interpreter, read the target whether or not the jump
+            # is taken.
+            test = '!=' if opcode == 5 else '=='
+            lines.append('    value = %s' % _read(params[0], modes[0]))
+            lines.append('    target = %s' % _read(params[1], modes[1]))
+            lines.append('    if value %s 0:' % test)
+            lines.append('        return target')
+        elif opcode == 9:
+            lines.append('    rb += %s' % _read(params[0], modes[0]))
+        elif opcode == 99:
+            lines.append('    vm.halted.set()')
+        next_ips.extend([next_ip] * (len(lines) - len(next_ips)))
+    lines.extend(_exit(end))
+    next_ips.extend([end] * (len(lines) - len(next_ips)))
+    return lines, end, live, tuple(next_ips)
+
+
+@functools.lru_cache(maxsize=4096)
+def _build(start, body, next_ips):
+    # Identical code at the same address compiles to the same function, so
+    # computers running the same program share their blocks.
+    #
+    # If an instruction fails, leave the VM where the interpreter would: rb
+    # written back, and ip just past the failing instruction, found from the
+    # line it failed on.
+    source = '\n'.join([
+        'def block_%d(vm, mem, code, inq, outq):' % start,
+        '    rb = vm.relative_base',
+        '    try:',
+        '\n'.join('    ' + line for line in body.split('\n')),
+        '    except BaseException as e:',
+        '        vm.ip = next_ips[e.__traceback__.tb_lineno - 4]',
+        '        raise',
+        '    finally:',
+        '        vm.relative_base = rb',
+        '',
+    ])
+    namespace = {'bad_read_mode': _bad_read_mode, 'next_ips': next_ips}
+    exec(compile(source, '<intcode block %d>' % start, 'exec'), namespace)
+    return namespace['block_%d' % start]
@@ -0,0 +1,245 @@
+import asyncio
+import collections
+import time
+
+from .memory import Memory
+
+Snapshot = collections.namedtuple(
+    'Snapshot', ['program', 'ip', 'relative_base', 'halted', 'inputs', 'outputs', 'instructions'])
+
+
+class IntcodeComputer:
+
+    # The longest instruction is an opcode followed by three parameters, so a
+    # write to address `at` can only land inside instructions starting at
+    # at - 3 through at.
+    MAX_PARAMS = 3
+
+    def __init__(self, program, input_queue=None, output_queue=None, profiler=None):
+        self.program = Memory(program)
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.profiler = profiler
+        self.ip = 0
+        self.relative_base = 0
+        self.halted = asyncio.Event()
+        self._instructions = {}
+
+    @property
+    def finished(self):
+        return self.halted.is_set() and self.output_queue.empty()
+
+    def snapshot(self):
+        """Capture the VM state, including anything still sitting in its queues."""
+        return Snapshot(
+            self.program.copy(),
+            self.ip,
+            self.relative_base,
+            self.halted.is_set(),
+            _queue_contents(self.input_queue),
+            _queue_contents(self.output_queue),
+            self._instructions.copy(),
+        )
+
+    def restore(self, snapshot):
+        self.program = snapshot.program.copy()
+        self.ip = snapshot.ip
+        self.relative_base = snapshot.relative_base
+        if snapshot.halted:
+            self.halted.set()
+        else:
+            self.halted.clear()
+        _refill_queue(self.input_queue, snapshot.inputs)
+        _refill_queue(self.output_queue, snapshot.outputs)
+        self._instructions = snapshot.instructions.copy()
+
+    def fork(self, snapshot=None):
+        """Return a new computer, with its own queues, resuming from `snapshot`
+        (or from this computer's current state)."""
+        if snapshot is None:
+            snapshot = self.snapshot()
+        computer = type(self)(
+            (),
+            None if self.input_queue is None else asyncio.Queue(self.input_queue.maxsize),
+            None if self.output_queue is None else asyncio.Queue(self.output_queue.maxsize),
+            self.profiler)
+        computer.restore(snapshot)
+        return computer
+
+    async def run(self):
+        while True:
+            self.run_until_blocked()
+            if self.halted.is_set():
+                return
+            # The next instruction is I/O on an empty input queue or a full
+            # output queue, so hand control back to the event loop.
+            if self.profiler is None:
+                await self.step()
+            else:
+                await self.profiler.wait(self)
+
+    def run_until_blocked(self):
+        """Execute instructions without suspending until the VM halts or the
+        next instruction would have to wait on one of its queues."""
+        if self.profiler is not None:
+            self._run_until_blocked_profiled()
+            return
+        input_queue = self.input_queue
+        output_queue = self.output_queue
+        halted = self.halted
+        fetch = self._fetch
+        while not halted.is_set():
+            opcode, handler, modes, params = fetch()
+            if opcode == 3 and input_queue.empty():
+                return
+            if opcode == 4 and output_queue.full():
+                return
+            self.ip += len(params) + 1
+            handler(self, modes, params)
+
+    def _run_until_blocked_profiled(self):
+        profiler = self.profiler
+        start = time.perf_counter()
+        try:
+            while not self.halted.is_set():
+                opcode, handler, modes, params = self._fetch()
+                if opcode == 3 and self.input_queue.empty():
+                    return
+                if opcode == 4 and self.output_queue.full():
+                    return
+                profiler.record(self, opcode, modes, params)
+                self.ip += len(params) + 1
+                handler(self, modes, params)
+        finally:
+            profiler.compute_seconds += time.perf_counter() - start
+
+    async def step(self):
+        opcode, handler, modes, params = self._fetch()
+        if opcode == 3:
+            value = await self.input_queue.get()
+            self.ip += len(params) + 1
+            self._write(params[0], modes[0], value)
+        elif opcode == 4:
+            await self.output_queue.put(self._read(params[0], modes[0]))
+            self.ip += len(params) + 1
+        else:
+            self.ip += len(params) + 1
+            handler(self, modes, params)
+
+    def _fetch(self):
+        instruction = self._instructions.get(self.ip)
+        if instruction is None:
+            instruction = self._decode(self.ip)
+            self._instructions[self.ip] = instruction
+        return instruction
+
+    def _decode(self, ip):
+        instr = self.program[ip]
+        try:
+            handler, arity = self.OPCODES[instr % 100]
+        except KeyError:
+            raise ValueError('bad opcode %d at %d' % (instr, ip)) from None
+        modes = tuple(instr // 10 ** (i + 2) % 10 for i in range(arity))
+        params = tuple(self.program[ip + i] for i in range(1, arity + 1))
+        return instr % 100, handler, modes, params
+
+    def _read(self, at, mode):
+        if mode == 0:
+            return self.program[at]
+        if mode == 1:
+            return at
+        if mode == 2:
+            return self.program[self.relative_base + at]
+        raise ValueError('bad read mode')
+
+    def _write(self, at, mode, value):
+        if mode == 0:
+            self._store(at, value)
+            return
+        if mode == 1:
+            raise ValueError('write with mode=1 not allowed')
+        if mode == 2:
+            self._store(self.relative_base + at, value)
+            return
+        raise ValueError('bad write mode')
+
+    def _store(self, at, value):
+        self.program[at] = value
+        # Self-modifying code: drop any decoded instruction that covers `at`.
+        for ip in range(at - self.MAX_PARAMS, at + 1):
+            self._instructions.pop(ip, None)
+
+    def _add(self, modes, params):
+        a = self._read(params[0], modes[0])
+        b = self._read(params[1], modes[1])
+        self._write(params[2], modes[2], a + b)
+
+    def _multiply(self, modes, params):
+        a = self._read(params[0], modes[0])
+        b = self._read(params[1], modes[1])
+        self._write(params[2], modes[2], a * b)
+
+    def _input(self, modes, params):
+        self._write(params[0], modes[0], self.input_queue.get_nowait())
+
+    def _output(self, modes, params):
+        a = self._read(params[0], modes[0])
+        self.output_queue.put_nowait(a)
+
+    def _jump_if_true(self, modes, params):
+        p = self._read(params[0], modes[0])
+        d = self._read(params[1], modes[1])
+        if p != 0:
+            self.ip = d
+
+    def _jump_if_false(self, modes, params):
+        p = self._read(params[0], modes[0])
+        d = self._read(params[1], modes[1])
+        if p == 0:
+            self.ip = d
+
+    def _less_than(self, modes, params):
+        a = self._read(params[0], modes[0])
+        b = self._read(params[1], modes[1])
+        self._write(params[2], modes[2], 1 if a < b else 0)
+
+    def _equals(self, modes, params):
+        a = self._read(params[0], modes[0])
+        b = self._read(params[1], modes[1])
+        self._write(params[2], modes[2], 1 if a == b else 0)
+
+    def _relative_base_offset(self, modes, params):
+        a = self._read(params[0], modes[0])
+        self.relative_base += a
+
+    def _hlt(self, modes, params):
+        self.halted.set()
+
+    OPCODES = {
+        1: (_add, 3),
+        2: (_multiply, 3),
+        3: (_input, 1),
+        4: (_output, 1),
+        5: (_jump_if_true, 2),
+        6: (_jump_if_false, 2),
+        7: (_less_than, 3),
+        8: (_equals, 3),
+        9: (_relative_base_offset, 1),
+        99: (_hlt, 0),
+    }
+
+
+def _queue_contents(queue):
+    if queue is None:
+        return ()
+    # asyncio.Queue has no way to peek, and draining it would wake waiters.
+    return tuple(queue._queue)
+
+
+def _refill_queue(queue, items):
+    if queue is None:
+        return
+    while not queue.empty():
+        queue.get_nowait()
+    for item in items:
+        queue.put_nowait(item)
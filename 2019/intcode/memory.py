@@ -0,0 +1,65 @@
+import array
+
+
+class Memory:
+    """Intcode memory.
+
+    The program image lives in a compact int64 array. Addresses past the end
+    of the image are kept sparsely, so a far relative-base write costs one
+    entry rather than growing the image up to it. The image falls back to a
+    list of Python ints the first time a value does not fit in 64 bits.
+
+    copy() is copy-on-write: the copies share storage until one of them is
+    written to.
+    """
+
+    def __init__(self, program=()):
+        try:
+            self._image = array.array('q', program)
+        except OverflowError:
+            self._image = list(program)
+        self._overflow = {}
+        self._shared = False
+
+    def __len__(self):
+        return max(len(self._image), max(self._overflow, default=-1) + 1)
+
+    def __getitem__(self, at):
+        try:
+            if at >= 0:
+                return self._image[at]
+        except IndexError:
+            return self._overflow.get(at, 0)
+        raise ValueError('bad address %d' % at)
+
+    def __setitem__(self, at, value):
+        if self._shared:
+            self._unshare()
+        try:
+            if at >= 0:
+                self._image[at] = value
+                return
+        except IndexError:
+            self._overflow[at] = value
+            return
+        except OverflowError:
+            self._image = list(self._image)
+            self._image[at] = value
+            return
+        raise ValueError('bad address %d' % at)
+
+    def __iter__(self):
+        for at in range(len(self)):
+            yield self[at]
+
+    def copy(self):
+        memory = Memory.__new__(Memory)
+        memory._image = self._image
+        memory._overflow = self._overflow
+        memory._shared = self._shared = True
+        return memory
+
+    def _unshare(self):
+        self._image = self._image[:]
+        self._overflow = self._overflow.copy()
+        self._shared = False
@@ -0,0 +1,122 @@
+import collections
+import json
+import time
+
+
+class Profiler:
+    """Counters for one or more IntcodeComputers.
+
+    Pass a Profiler to IntcodeComputer to turn instrumentation on; computers
+    without one never touch it. A profiled CompiledIntcodeComputer runs on the
+    interpreter so that every instruction is seen.
+
+    Call stacks for the folded-stack export are inferred from call
+    sequences: a relative base adjustment directly before or after a taken
+    jump. A positive one enters a frame named after the function's entry
+    address (the jump target, or the adjustment itself if it follows the
+    jump), and a negative one leaves it. Adjustments made anywhere else,
+    such as one-off setup, leave the stack alone.
+    """
+
+    def __init__(self):
+        self.opcodes = collections.Counter()
+        self.addresses = collections.Counter()
+        self.stacks = collections.Counter()
+        self.compute_seconds = 0.0
+        self.blocked_seconds = {'input': 0.0, 'output': 0.0}
+        self.high_water = {'input': 0, 'output': 0}
+        self._frames = {}
+        # For each computer whose last instruction was a relative base
+        # adjustment or a taken jump, the direction of the adjustment (1 or
+        # -1, or 0 if it did nothing) or None for the jump.
+        self._last = {}
+
+    def record(self, computer, opcode, modes, params):
+        """Count the instruction `computer` is about to execute."""
+        name = _NAMES[opcode]
+        self.opcodes[name] += 1
+        self.addresses[computer.ip] += 1
+        frames = self._frames.setdefault(computer, [])
+        self.stacks[tuple(frames) + (name,)] += 1
+        last = self._last.pop(computer, 0)
+        if opcode == 9:
+            offset = computer._read(params[0], modes[0])
+            direction = (offset > 0) - (offset < 0)
+            if last is None:
+                _call_or_return(frames, direction, computer.ip)
+            else:
+                self._last[computer] = direction
+        elif opcode in (5, 6):
+            if (computer._read(params[0], modes[0]) != 0) == (opcode == 5):
+                if last:
+                    _call_or_return(frames, last, computer._read(params[1], modes[1]))
+                else:
+                    self._last[computer] = None
+        elif opcode == 3:
+            self._queue_size('input', computer.input_queue)
+        elif opcode == 4:
+            self._queue_size('output', computer.output_queue, 1)
+
+    async def wait(self, computer):
+        """Run computer.step() for an instruction that has to wait on a queue,
+        and charge the time to that queue."""
+        opcode, _, modes, params = computer._fetch()
+        self.record(computer, opcode, modes, params)
+        queue = 'input' if opcode == 3 else 'output'
+        start = time.perf_counter()
+        await computer.step()
+        self.blocked_seconds[queue] += time.perf_counter() - start
+        if queue == 'input':
+            self._queue_size(queue, computer.input_queue, 1)
+        else:
+            self._queue_size(queue, computer.output_queue)
+
+    def report(self):
+        return {
+            'instructions': sum(self.opcodes.values()),
+            'opcodes': dict(self.opcodes.most_common()),
+            'addresses': {str(at): count for at, count in self.addresses.most_common()},
+            'compute_seconds': self.compute_seconds,
+            'blocked_seconds': self.blocked_seconds,
+            'queue_high_water': self.high_water,
+        }
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def write_folded(self, path):
+        """Write instruction counts as folded stacks, for flamegraph.pl and
+        compatible viewers."""
+        with open(path, 'w') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write('%s %d\n' % (';'.join(('intcode',) + stack), count))
+
+    def save(self, prefix):
+        self.write_json(prefix + '.json')
+        self.write_folded(prefix + '.folded')
+
+    def _queue_size(self, queue, q, pending=0):
+        if q is not None:
+            self.high_water[queue] = max(self.high_water[queue], q.qsize() + pending)
+
+
+def _call_or_return(frames, direction, entry):
+    if direction > 0:
+        frames.append('fn@%d' % entry)
+    elif direction < 0 and frames:
+        frames.pop()
+
+
+_NAMES = {
+    1: 'add',
+    2: 'multiply',
+    3: 'input',
+    4: 'output',
+    5: 'jump_if_true',
+    6: 'jump_if_false',
+    7: 'less_than',
+    8: 'equals',
+    9: 'relative_base_offset',
+    99: 'halt',
+}
@@ -0,0 +1,72 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from . import compiler
+from .compiler import CompiledIntcodeComputer
+from .computer import IntcodeComputer
+
+
+def run(cls, program):
+    """Run `program` to completion on a `cls` computer, and return its
+    outputs, the message of the error it stopped with, if any, and the VM
+    state it was left in."""
+    computer = cls(program, asyncio.Queue(), asyncio.Queue())
+    error = None
+    try:
+        asyncio.run(computer.run())
+    except ValueError as e:
+        error = str(e)
+    outputs = []
+    while not computer.output_queue.empty():
+        outputs.append(computer.output_queue.get_nowait())
+    state = (computer.ip, computer.relative_base, list(computer.program))
+    return outputs, error, state
+
+
+class CompiledIntcodeComputerTest(unittest.TestCase):
+
+    def assertSameAsInterpreter(self, program):
+        expected = run(IntcodeComputer, program)
+        for threshold in (1, 2, compiler.HOT_THRESHOLD):
+            with self.subTest(threshold=threshold), mock.patch.object(compiler, 'HOT_THRESHOLD', threshold):
+                self.assertEqual(run(CompiledIntcodeComputer, program), expected)
+        return expected[:2]
+
+    def test_rewritten_bad_read_mode(self):
+        # The block at 4 rewrites the word at 8 from 304 (a bad read mode)
+        # to 104 before reaching it, so it must not fail to compile.
+        program = [1101, 304, 0, 8, 1101, 104, 0, 8, 104, 7, 1001, 100, -1, 100, 1005, 100, 0, 99]
+        program += [0] * (101 - len(program))
+        program[100] = 40
+        outputs, error = self.assertSameAsInterpreter(program)
+        self.assertEqual(outputs, [7] * 40)
+        self.assertIsNone(error)
+
+    def test_bad_read_mode(self):
+        outputs, error = self.assertSameAsInterpreter([104, 1, 304, 0, 99])
+        self.assertEqual(outputs, [1])
+        self.assertEqual(error, 'bad read mode')
+
+    def test_jump_target_read_when_not_taken(self):
+        # The jump is not taken, but its target is read from address -100.
+        _, error = self.assertSameAsInterpreter([109, -100, 2105, 0, 0, 99])
+        self.assertIsNotNone(error)
+
+    def test_bad_read_mode_before_bad_write_mode(self):
+        # Both operands of the add use mode 9, and so does its output.
+        _, error = self.assertSameAsInterpreter([109, 5, 104, 1, 99901, 0, 0, 0, 99])
+        self.assertEqual(error, 'bad read mode')
+
+    def test_read_before_write_mode_one(self):
+        _, error = self.assertSameAsInterpreter([109, 5, 104, 1, 19908, 0, 0, 0, 99])
+        self.assertEqual(error, 'bad read mode')
+
+    def test_state_after_error(self):
+        # The relative base moves inside the block that fails.
+        _, error = self.assertSameAsInterpreter([109, 7, 109, 3, 21101, 1, 2, 0, 11101, 1, 2, 0, 99])
+        self.assertEqual(error, 'write with mode=1 not allowed')
+
+
+if __name__ == '__main__':
+    unittest.main()
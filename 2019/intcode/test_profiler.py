@@ -0,0 +1,34 @@
+import asyncio
+import unittest
+
+from .computer import IntcodeComputer
+from .profiler import Profiler
+
+
+class ProfilerTest(unittest.TestCase):
+
+    def test_counts_reads_that_wait(self):
+        # Echo three inputs, each of which only arrives once the computer
+        # is already waiting for it.
+        program = [3, 0, 4, 0, 3, 0, 4, 0, 3, 0, 4, 0, 99]
+        profiler = Profiler()
+        computer = IntcodeComputer(program, asyncio.Queue(), asyncio.Queue(), profiler)
+
+        async def feed():
+            task = asyncio.create_task(computer.run())
+            outputs = []
+            for value in (1, 2, 3):
+                await asyncio.sleep(0)
+                computer.input_queue.put_nowait(value)
+                outputs.append(await computer.output_queue.get())
+            await task
+            return outputs
+
+        self.assertEqual(asyncio.run(feed()), [1, 2, 3])
+        self.assertEqual(profiler.opcodes['input'], 3)
+        self.assertEqual(profiler.opcodes['output'], 3)
+        self.assertEqual(sum(profiler.opcodes.values()), 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
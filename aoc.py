@@ -0,0 +1,137 @@
+#!/usr/bin/python3
+"""Run puzzle solvers by year and day.
+
+    ./aoc.py 2018/day06 2019/day04       solve each day with its checked-in input
+    ./aoc.py 2018/day06 -i other.txt     solve with another input
+    ./aoc.py --list                      list the days that have solvers
+
+Days are found from the YYYY/dayNN directories, and a solver is only
+imported when it is asked for. Solvers with parse(text) and solve(parsed)
+are called directly, so one process can solve any number of inputs; the
+rest are run through their main() from inside their own directory. A
+solve() that answers more than one part returns a list of the parts, each
+printed on its own line.
+"""
+
+import argparse
+import contextlib
+import glob
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+_modules = {}
+
+
+def days():
+    """Return the names ('2018/day06', ...) of every day with a solver."""
+    found = []
+    for directory in sorted(glob.glob(os.path.join(ROOT, '[0-9]' * 4, 'day[0-9][0-9]'))):
+        if _solver_path(directory) is not None:
+            found.append(os.path.relpath(directory, ROOT).replace(os.sep, '/'))
+    return found
+
+
+def _solver_path(directory):
+    scripts = sorted(glob.glob(os.path.join(directory, '*.py')))
+    return scripts[0] if len(scripts) == 1 else None
+
+
+def input_path(name):
+    """Return the checked-in input for day `name`, or None if it has none."""
+    directory = os.path.join(ROOT, name)
+    for filename in ['input.txt'] + sorted(glob.glob(os.path.join(directory, '*-input.txt'))):
+        path = os.path.join(directory, filename)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load(name):
+    """Import the solver for day `name`, once."""
+    if name not in _modules:
+        path = _solver_path(os.path.join(ROOT, name))
+        if path is None:
+            raise KeyError('no solver for %s' % name)
+        spec = importlib.util.spec_from_file_location('aoc_' + name.replace('/', '_'), path)
+        module = importlib.util.module_from_spec(spec)
+        # Process pools pickle their task functions by module name.
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+        _modules[name] = module
+    return _modules[name]
+
+
+@contextlib.contextmanager
+def _in_directory(path):
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
+
+
+def run(name, text=None):
+    """Solve day `name` for the input `text` (its checked-in input by
+    default) and return the answer, or a list of answers to each part.
+
+    Solvers without parse() and solve() print their answers themselves and
+    can only be run on their checked-in input; for those this returns None.
+    """
+    module = load(name)
+    if hasattr(module, 'parse') and hasattr(module, 'solve'):
+        if text is None:
+            path = input_path(name)
+            if path is None:
+                raise FileNotFoundError('no input for %s' % name)
+            with open(path) as f:
+                text = f.read()
+        return module.solve(module.parse(text))
+    if text is not None:
+        raise ValueError('%s can only solve its own input' % name)
+    # main() may look at its own command line arguments.
+    argv = sys.argv
+    sys.argv = [module.__file__]
+    try:
+        with _in_directory(os.path.join(ROOT, name)):
+            module.main()
+    finally:
+        sys.argv = argv
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run puzzle solvers.')
+    parser.add_argument('days', nargs='*', metavar='YEAR/DAY', help='e.g. 2018/day06')
+    parser.add_argument('-i', '--input', help='solve this input file instead of the checked-in one')
+    parser.add_argument('--list', action='store_true', help='list the days that have solvers')
+    args = parser.parse_args()
+
+    if args.list:
+        for name in days():
+            print(name)
+        return 0
+    if not args.days:
+        parser.error('no days given')
+
+    text = None
+    if args.input is not None:
+        with open(args.input) as f:
+            text = f.read()
+    for name in args.days:
+        name = name.strip('/')
+        if len(args.days) > 1:
+            print('%s:' % name)
+        answer = run(name, text)
+        # Solvers answering more than one part return a list of the parts.
+        for part in answer if isinstance(answer, list) else [answer]:
+            if part is not None:
+                print(part)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
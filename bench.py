@@ -0,0 +1,358 @@
+#!/usr/bin/python3
+"""Benchmarks for the puzzle solvers.
+
+Each benchmark loads a solver module straight from its file, parses the
+checked-in input next to it, and times the solver's compute function. Peak
+memory is measured on one extra run under tracemalloc, so it does not skew
+the timings.
+
+    ./bench.py                   run everything but the slow benchmarks
+    ./bench.py 2018/day0 --slow  only names starting with 2018/day0, slow included
+    ./bench.py --update          record the results as the new baseline
+
+Results are compared against the baseline file, and any benchmark that got
+slower or bigger by more than the threshold is reported as a regression
+(and makes the exit status non-zero).
+"""
+
+import argparse
+import asyncio
+import collections
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+Benchmark = collections.namedtuple('Benchmark', ['name', 'path', 'prepare', 'slow'])
+
+BENCHMARKS = []
+
+
+def benchmark(name, filename, slow=False):
+    """Register `prepare(module, read)`, which parses the input (using
+    `read(filename)` to get the text of a file next to the solver) and returns
+    the zero-argument callable to time."""
+    def register(prepare):
+        BENCHMARKS.append(Benchmark(name, os.path.join(ROOT, name, filename), prepare, slow))
+        return prepare
+    return register
+
+
+@benchmark('2018/day01', 'day01.py')
+def bench_2018_day01(module, read):
+    changes = [int(x) for x in read('input.txt').split()]
+    return lambda: module.compute(changes)
+
+
+@benchmark('2018/day02', 'day02.py')
+def bench_2018_day02(module, read):
+    ids = read('input.txt').splitlines(keepends=True)
+    return lambda: module.compute(ids)
+
+
+@benchmark('2018/day03', 'day03.py')
+def bench_2018_day03(module, read):
+    claims = [module.Claim.of(x) for x in read('input.txt').splitlines()]
+    return lambda: module.compute(claims)
+
+
+@benchmark('2018/day04', 'day04.py')
+def bench_2018_day04(module, read):
+    log = read('input.txt').splitlines()
+    return lambda: module.compute(log)
+
+
+@benchmark('2018/day05', '2018-day05.py')
+def bench_2018_day05(module, read):
+    polymer = read('2018-day05-input.txt').strip().encode()
+    return lambda: module.compute(polymer, workers=1)
+
+
+@benchmark('2018/day06', '2018-day06.py')
+def bench_2018_day06(module, read):
+    parsed = module.parse(read('2018-day06-input.txt'))
+    return lambda: module.solve(parsed)
+
+
+@benchmark('2018/day07', '2018-day07.py')
+def bench_2018_day07(module, read):
+    parsed = module.parse(read('2018-day07-input.txt'))
+    return lambda: module.solve(parsed)
+
+
+@benchmark('2018/day08', '2018-day08.py')
+def bench_2018_day08(module, read):
+    parsed = module.parse(read('2018-day08-input.txt'))
+    return lambda: module.solve(parsed)
+
+
+@benchmark('2018/day09', '2018-day09.py', slow=True)
+def bench_2018_day09(module, read):
+    parsed = module.parse(read('2018-day09-input.txt'))
+    return lambda: module.solve(parsed)
+
+
+@benchmark('2018/day10', '2018-day10.py')
+def bench_2018_day10(module, read):
+    parsed = module.parse(read('2018-day10-input.txt'))
+    return lambda: module.solve(parsed)
+
+
+@benchmark('2018/day11', 'day11.py', slow=True)
+def bench_2018_day11(module, read):
+    parsed = module.parse(read('input.txt'))
+    return lambda: module.solve(parsed)
+
+
+@benchmark('2018/dag', 'graph.py')
+def bench_2018_dag(module, read):
+    # A synthetic graph well past the 26 steps of day07: 100 000 nodes,
+    # each depended on by up to three later ones.
+    rng = random.Random(7)
+    size = 100_000
+    dag = module.DAG()
+    for node in range(size):
+        dag.add_node(node)
+        for _ in range(rng.randint(0, 3)):
+            if node + 1 < size:
+                dag.add_edge(node, rng.randrange(node + 1, min(size, node + 1000)))
+    return lambda: (dag.serial_order(), dag.parallel_schedule(16, lambda node: 1 + node % 7))
+
+
+@benchmark('2019/day01', 'day01.py')
+def bench_2019_day01(module, read):
+    masses = [int(x) for x in read('input.txt').split()]
+    return lambda: module.compute(masses)
+
+
+@benchmark('2019/day02', 'day02.py')
+def bench_2019_day02(module, read):
+    program = [int(x) for x in read('input.txt').split(',')]
+    return lambda: asyncio.run(module.compute(program))
+
+
+@benchmark('2019/day03', '2019-day03.py')
+def bench_2019_day03(module, read):
+    parsed = module.parse(read('2019-day03-input.txt'))
+    return lambda: module.solve(parsed)
+
+
+@benchmark('2019/day04', 'day04.py')
+def bench_2019_day04(module, read):
+    parsed = module.parse(read('input.txt'))
+    return lambda: module.solve(parsed)
+
+
+@benchmark('2019/day05', 'day05.py')
+def bench_2019_day05(module, read):
+    # Days that keep all their work in main() are timed through it (stdout
+    # is suppressed while benchmarking).
+    return module.main
+
+
+@benchmark('2019/day06', 'day06.py')
+def bench_2019_day06(module, read):
+    edges = module.parse(read('input.txt').splitlines())
+    return lambda: module.transfers(edges, edges['YOU'][0], edges['SAN'][0])
+
+
+@benchmark('2019/day07', 'day07.py')
+def bench_2019_day07(module, read):
+    program = [int(x) for x in read('input.txt').strip().split(',')]
+    return lambda: module.search(program, workers=1)
+
+
+@benchmark('2019/day08', '2019-day08.py')
+def bench_2019_day08(module, read):
+    parsed = module.parse(read('2019-day08-input.txt'))
+    return lambda: module.solve(parsed)
+
+
+@benchmark('2019/day09', 'day09.py')
+def bench_2019_day09(module, read):
+    return module.main
+
+
+@benchmark('2019/day10', 'day10.py')
+def bench_2019_day10(module, read):
+    return module.main
+
+
+@benchmark('2019/day11', 'day11.py')
+def bench_2019_day11(module, read):
+    program = [int(x) for x in read('input.txt').split(',')]
+    return lambda: asyncio.run(module.run(list(program)))
+
+
+@benchmark('2019/day12', 'day12.py')
+def bench_2019_day12(module, read):
+    return module.main
+
+
+@benchmark('2019/day13', 'day13.py')
+def bench_2019_day13(module, read):
+    program = [int(x) for x in read('input.txt').split(',')]
+    return lambda: asyncio.run(module.run(list(program)))
+
+
+@benchmark('2019/day14', 'day14.py')
+def bench_2019_day14(module, read):
+    return module.main
+
+
+@benchmark('2019/day15', 'day15.py')
+def bench_2019_day15(module, read):
+    program = [int(x) for x in read('input.txt').split(',')]
+    return lambda: asyncio.run(module.run(list(program)))
+
+
+@benchmark('2019/day16', 'day16.py')
+def bench_2019_day16(module, read):
+    signal = [int(x) for x in read('input.txt').strip()] * 10_000
+    offset = int(''.join(str(x) for x in signal[:7]))
+    return lambda: module.do_phase(signal, offset)
+
+
+@benchmark('2019/day17', 'day17.py')
+def bench_2019_day17(module, read):
+    program = [int(x) for x in read('input.txt').split(',')]
+    return lambda: asyncio.run(module.run(list(program)))
+
+
+@benchmark('2019/day18', 'day18.py', slow=True)
+def bench_2019_day18(module, read):
+    grid, starts = module.parse(read('input.txt').strip().splitlines())
+    # find_shortest_distance memoizes in its default argument; start cold.
+    memo = module.find_shortest_distance.__defaults__[0]
+
+    def run():
+        memo.clear()
+        return module.find_shortest_distance(grid, starts, frozenset())
+    return run
+
+
+@benchmark('2019/day19', 'day19.py')
+def bench_2019_day19(module, read):
+    program = [int(x) for x in read('input.txt').split(',')]
+    return lambda: module.find_square(module.BeamScanner(program, workers=1), 100)
+
+
+@benchmark('2019/day20', 'day20.py')
+def bench_2019_day20(module, read):
+    grid, portals, w, h = module.parse(read('input.txt').strip('\n').splitlines())
+    return lambda: module.shortest(grid, portals, w, h, portals['AA'][0], portals['ZZ'][0])
+
+
+@benchmark('2019/day21', 'day21.py')
+def bench_2019_day21(module, read):
+    program = [int(x) for x in read('input.txt').split(',')]
+    return lambda: asyncio.run(module.run(list(program)))
+
+
+@contextlib.contextmanager
+def _in_directory(path):
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
+
+
+def load(bench):
+    name = 'bench_' + bench.name.replace('/', '_')
+    spec = importlib.util.spec_from_file_location(name, bench.path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure(bench, warmup, repeat):
+    directory = os.path.dirname(bench.path)
+
+    def read(filename):
+        with open(os.path.join(directory, filename)) as f:
+            return f.read()
+
+    with _in_directory(directory), contextlib.redirect_stdout(io.StringIO()):
+        run = bench.prepare(load(bench), read)
+        for _ in range(warmup):
+            run()
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {
+        'min_seconds': min(times),
+        'mean_seconds': statistics.mean(times),
+        'peak_bytes': peak,
+    }
+
+
+def regressions(result, baseline, threshold):
+    """Return a description of each way `result` is worse than `baseline`."""
+    found = []
+    for key in ('min_seconds', 'peak_bytes'):
+        if key in baseline and result[key] > baseline[key] * (1 + threshold):
+            found.append('%s %+.0f%%' % (key, (result[key] / baseline[key] - 1) * 100))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the puzzle solvers.')
+    parser.add_argument('prefix', nargs='?', default='', help='only run benchmarks whose name starts with this')
+    parser.add_argument('--slow', action='store_true', help='include the slow benchmarks')
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--baseline', default=os.path.join(ROOT, 'bench.json'))
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='fractional slowdown or growth that counts as a regression')
+    parser.add_argument('--update', action='store_true', help='write the results to the baseline')
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    failed = False
+    for bench in BENCHMARKS:
+        if not bench.name.startswith(args.prefix) or (bench.slow and not args.slow):
+            continue
+        try:
+            result = measure(bench, args.warmup, args.repeat)
+        except ImportError as e:
+            print('%-12s skipped: %s' % (bench.name, e))
+            continue
+        results[bench.name] = result
+        found = regressions(result, baseline.get(bench.name, {}), args.threshold)
+        failed = failed or bool(found)
+        print('%-12s %9.4fs min %9.4fs mean %8.1f KiB peak%s' % (
+            bench.name, result['min_seconds'], result['mean_seconds'], result['peak_bytes'] / 1024,
+            '  REGRESSION: ' + ', '.join(found) if found else ''))
+
+    if args.update:
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())